@@ -2,7 +2,7 @@ from flask import Flask, jsonify, send_from_directory
 from .config import Config
 import uuid
 import os
-from .database import db
+from .database import db, sync_columns, sync_indexes
 
 # Import Blueprints
 from .routes.auth_routes import auth_bp, init_oauth
@@ -16,6 +16,9 @@ from .routes.utility_routes import utility_bp
 from .routes.interview_routes import interview_bp
 from .routes.timeline_routes import timeline_bp
 from .routes.matching_routes import matching_bp
+from .services.match_store import match_store
+from .services.warmup import start_warmup
+from .services.job_search import job_search
 
 from .models import User, Job, Profile, Experience, Application, Employee, Performance, Analytics, ChatMessage
 
@@ -31,6 +34,13 @@ def create_app():
 
     with app.app_context():
         db.create_all()
+        sync_columns()
+        sync_indexes()
+        Profile.backfill_legacy_keys()
+        Application.backfill_match_scores()
+
+    # Full-text index over jobs (FTS5 / tsvector), kept in sync by the database itself
+    job_search.init_app(app)
 
     # Register Blueprints
     # Note: url_prefix='/api' is common. Some routes might define their own paths if needed,
@@ -54,4 +64,11 @@ def create_app():
     # Initialize OAuth
     init_oauth(app)
 
+    # Background rescoring of stored match scores
+    match_store.init_app(app)
+
+    # Load the spaCy model / LLM clients off the request path (see /api/system/status)
+    if app.config.get('MODEL_WARMUP', True):
+        start_warmup()
+
     return app
@@ -6,4 +6,73 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../.env'))
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SECRET_KEY = os.getenv('SECRET_KEY')
\ No newline at end of file
+    SECRET_KEY = os.getenv('SECRET_KEY')
+
+    # Matching: max number of candidate profiles whose parsed features are kept in memory
+    PROFILE_FEATURE_CACHE_SIZE = int(os.getenv('PROFILE_FEATURE_CACHE_SIZE', 1024))
+
+    # Matching: rescore stored match scores in a background thread (set to 'false' to run inline)
+    MATCH_REFRESH_ASYNC = os.getenv('MATCH_REFRESH_ASYNC', 'true').lower() != 'false'
+
+    # Matching: approximate nearest-neighbour index used to shortlist recommendations
+    ANN_NPROBE = int(os.getenv('ANN_NPROBE', 32))
+    ANN_MIN_TRAIN_SIZE = int(os.getenv('ANN_MIN_TRAIN_SIZE', 2048))
+    RECOMMENDATION_SHORTLIST_SIZE = int(os.getenv('RECOMMENDATION_SHORTLIST_SIZE', 200))
+
+    # Matching: spaCy nlp.pipe settings for batch parsing (n_process > 1 forks parser processes per batch)
+    NLP_BATCH_SIZE = int(os.getenv('NLP_BATCH_SIZE', 64))
+    NLP_N_PROCESS = int(os.getenv('NLP_N_PROCESS', 1))
+
+    # Matching: 'scoring' loads en_core_web_md without the parser and NER (unused by scoring,
+    # less latency and memory per worker); 'full' loads every component
+    SPACY_PIPELINE = os.getenv('SPACY_PIPELINE', 'scoring').lower()
+
+    # Load the spaCy model and LLM clients in a background thread when the app starts
+    # ('false' defers them to the first request that needs them)
+    MODEL_WARMUP = os.getenv('MODEL_WARMUP', 'true').lower() != 'false'
+
+    # Search: max full-text hits returned (and match-scored) per /api/jobs/search query
+    SEARCH_MAX_HITS = int(os.getenv('SEARCH_MAX_HITS', 100))
+
+    # Auth: how long (seconds) and how many legacy X-User-Id -> user resolutions are cached
+    LEGACY_IDENTITY_CACHE_TTL = int(os.getenv('LEGACY_IDENTITY_CACHE_TTL', 60))
+    LEGACY_IDENTITY_CACHE_SIZE = int(os.getenv('LEGACY_IDENTITY_CACHE_SIZE', 4096))
+
+    # Auth: verified JWT claims are cached (until the token expires, at most this many seconds)
+    TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', 300))
+    TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 10000))
+
+    # LLM: cache responses to identical prompts (memory LRU + SQLite file shared by workers);
+    # set LLM_CACHE=false to always call the provider
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE', 'true').lower() != 'false'
+    LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', os.path.join(os.path.dirname(__file__), '..', 'llm_cache.sqlite3'))
+    LLM_CACHE_MEMORY_SIZE = int(os.getenv('LLM_CACHE_MEMORY_SIZE', 512))
+    # Seconds a cached response stays valid, per endpoint (0 disables caching for it)
+    LLM_CACHE_TTLS = {
+        'jd': int(os.getenv('LLM_CACHE_TTL_JD', 7 * 24 * 3600)),
+        'interview-guide': int(os.getenv('LLM_CACHE_TTL_INTERVIEW_GUIDE', 7 * 24 * 3600)),
+        'mock-interview': int(os.getenv('LLM_CACHE_TTL_MOCK_INTERVIEW', 24 * 3600)),
+        'explanation': int(os.getenv('LLM_CACHE_TTL_EXPLANATION', 30 * 24 * 3600)),
+        'resume-parse': int(os.getenv('LLM_CACHE_TTL_RESUME_PARSE', 30 * 24 * 3600)),
+    }
+
+    # LLM routing: give up on a provider after this many seconds
+    LLM_DEADLINES = {
+        'gemini': float(os.getenv('LLM_DEADLINE_GEMINI', 30)),
+        'groq': float(os.getenv('LLM_DEADLINE_GROQ', 20)),
+    }
+    # Start the next provider in parallel when the current one is slower than its p95
+    # (or LLM_HEDGE_AFTER seconds, if set) and take whichever answers first
+    LLM_HEDGING = os.getenv('LLM_HEDGING', 'true').lower() != 'false'
+    LLM_HEDGE_AFTER = float(os.getenv('LLM_HEDGE_AFTER')) if os.getenv('LLM_HEDGE_AFTER') else None
+    # Smoothing of the per-provider latency average used to order providers (higher reacts faster)
+    LLM_EWMA_ALPHA = float(os.getenv('LLM_EWMA_ALPHA', 0.2))
+    # Forget a provider's average after this many seconds without calls, so a demoted one is retried
+    LLM_EWMA_RESET = float(os.getenv('LLM_EWMA_RESET', 60))
+
+    # LLM circuit breakers: skip a provider once this share of its recent calls failed
+    # (or at once on a quota error), then let one probe call through after the cool-down
+    LLM_BREAKER_FAILURE_RATE = float(os.getenv('LLM_BREAKER_FAILURE_RATE', 0.5))
+    LLM_BREAKER_MIN_CALLS = int(os.getenv('LLM_BREAKER_MIN_CALLS', 5))
+    LLM_BREAKER_WINDOW = int(os.getenv('LLM_BREAKER_WINDOW', 20))
+    LLM_BREAKER_COOLDOWN = float(os.getenv('LLM_BREAKER_COOLDOWN', 30))
@@ -1,3 +1,37 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
 
 db = SQLAlchemy()
+
+def sync_columns():
+    """
+    Adds nullable model columns that are missing from existing tables
+    (create_all never alters a table that already exists).
+    """
+    inspector = db.inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable or column.primary_key:
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            print(f"Added column {table.name}.{column.name}")
+
+def sync_indexes():
+    """
+    Creates the model indexes that are missing from an existing database
+    (create_all only creates indexes together with new tables).
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=db.engine, checkfirst=True)
+            except (IntegrityError, OperationalError, ProgrammingError) as e:
+                # e.g. duplicate rows preventing a unique index; the app still works without it
+                print(f"Could not create index {index.name}: {e}")
@@ -12,3 +12,21 @@ class Application(db.Model):
     match_explanation = db.Column(db.Text) # Stores JSON or text explanation from Gemini
     user = db.relationship('User', back_populates='applications')
     job = db.relationship('Job', back_populates='applications')
+
+    # One application per candidate per job, plus the keyset orders of "my applications"
+    # and the per-job HR board (the leading job_id also serves plain job lookups)
+    __table_args__ = (
+        db.Index('uq_applications_user_job', 'user_id', 'job_id', unique=True),
+        db.Index('ix_applications_user_applied', 'user_id', 'applied_at', 'id'),
+        db.Index('ix_applications_job_applied', 'job_id', 'applied_at', 'id'),
+        db.Index('ix_applications_job_score', 'job_id', 'match_score', 'id'),
+    )
+
+    @classmethod
+    def backfill_match_scores(cls):
+        """
+        Sets match_score to 0.0 where older rows left it NULL, so the board can sort and page on the column.
+        """
+        updated = cls.query.filter(cls.match_score.is_(None)).update({cls.match_score: 0.0}, synchronize_session=False)
+        if updated:
+            db.session.commit()
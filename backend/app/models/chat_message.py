@@ -9,3 +9,8 @@ class ChatMessage(db.Model):
     message = db.Column(db.Text, nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     user = db.relationship('User', back_populates='chat_messages')
+
+    # Serves a user's history in time order
+    __table_args__ = (
+        db.Index('ix_chat_messages_user_timestamp', 'user_id', 'timestamp'),
+    )
@@ -4,8 +4,8 @@ from datetime import datetime
 class Employee(db.Model):
     __tablename__ = 'employees'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    hired_by = db.Column(db.Integer)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    hired_by = db.Column(db.Integer, index=True)
     job_title = db.Column(db.String(120))
     department = db.Column(db.String(120))
     job_location = db.Column(db.String(50))
@@ -14,6 +14,11 @@ class Interview(db.Model):
     # Relationships
     application = db.relationship('Application', backref=db.backref('interviews', lazy=True, cascade="all, delete-orphan"))
 
+    # Serves the latest/upcoming interview per application
+    __table_args__ = (
+        db.Index('ix_interviews_application_scheduled', 'application_id', 'scheduled_at'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
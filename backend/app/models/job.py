@@ -18,6 +18,7 @@ class Job(db.Model):
     benefits = db.Column(db.String(255))  # comma-separated benefits
     application_deadline = db.Column(db.String(50))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    posted_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    posted_by = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
     posted_by_user = db.relationship('User', back_populates='jobs_posted')
-    applications = db.relationship('Application', back_populates='job', cascade='all, delete-orphan')
\ No newline at end of file
+    applications = db.relationship('Application', back_populates='job', cascade='all, delete-orphan')
+    match_scores = db.relationship('MatchScore', back_populates='job', cascade='all, delete-orphan', passive_deletes=True)
\ No newline at end of file
@@ -0,0 +1,31 @@
+from sqlalchemy import delete, event
+from ..database import db
+from datetime import datetime
+from .job import Job
+from .user import User
+
+class MatchScore(db.Model):
+    __tablename__ = 'match_scores'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True)
+    algorithm_version = db.Column(db.String(20), primary_key=True)
+    score = db.Column(db.Float, nullable=False, default=0.0) # Stores 0.0 to 100.0
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    user = db.relationship('User', back_populates='match_scores')
+    job = db.relationship('Job', back_populates='match_scores')
+
+    # Serves "ORDER BY score DESC LIMIT k" for one candidate
+    __table_args__ = (
+        db.Index('ix_match_scores_user_version_score', 'user_id', 'algorithm_version', 'score'),
+    )
+
+
+# Deleting a job or user removes its scores in one statement: the relationships are passive
+# (never loaded), and SQLite or tables created before ON DELETE CASCADE don't enforce the FK.
+@event.listens_for(Job, 'before_delete')
+def _delete_job_scores(mapper, connection, target):
+    connection.execute(delete(MatchScore.__table__).where(MatchScore.__table__.c.job_id == target.id))
+
+@event.listens_for(User, 'before_delete')
+def _delete_user_scores(mapper, connection, target):
+    connection.execute(delete(MatchScore.__table__).where(MatchScore.__table__.c.user_id == target.id))
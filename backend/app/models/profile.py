@@ -1,4 +1,9 @@
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from ..database import db
+from ..services.identity_cache import legacy_identity_cache
+from .user import User
 
 class Profile(db.Model):
     __tablename__ = 'profiles'
@@ -11,10 +16,48 @@ class Profile(db.Model):
     resume = db.Column(db.String(255))  # Path to uploaded resume file
     views = db.Column(db.Integer, default=0)
     completeness = db.Column(db.Integer, default=0)
+    # Legacy X-User-Id (first name + last 3 phone digits), kept in sync on flush
+    legacy_key = db.Column(db.String(100), index=True)
+    # Last change to the profile or its experiences/educations (bumped on flush), so
+    # the candidate ranking index only reloads the profiles changed since it last looked
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     user = db.relationship('User', back_populates='profile')
     experiences = db.relationship('Experience', back_populates='profile', cascade='all, delete-orphan')
     educations = db.relationship('Education', back_populates='profile', cascade='all, delete-orphan')
 
+    @staticmethod
+    def legacy_key_for(first_name, phone):
+        digits = ''.join(filter(str.isdigit, phone or ''))
+        if not first_name or not digits:
+            return None
+        return f"{first_name}{digits[-3:]}"
+
+    def refresh_legacy_key(self, first_name=None):
+        if first_name is None:
+            user = self.user or (db.session.get(User, self.user_id) if self.user_id else None)
+            first_name = user.first_name if user else None
+        key = self.legacy_key_for(first_name, self.phone)
+        if key != self.legacy_key:
+            if self.legacy_key:
+                legacy_identity_cache.pop(self.legacy_key)
+            self.legacy_key = key
+
+    @classmethod
+    def backfill_legacy_keys(cls):
+        """
+        Fills legacy_key for profiles stored before the column existed.
+        """
+        rows = (db.session.query(cls.id, User.first_name, cls.phone)
+                .join(User, User.id == cls.user_id)
+                .filter(cls.legacy_key.is_(None), cls.phone.isnot(None))
+                .all())
+        mappings = [{'id': profile_id, 'legacy_key': cls.legacy_key_for(first_name, phone)}
+                    for profile_id, first_name, phone in rows]
+        mappings = [m for m in mappings if m['legacy_key']]
+        if mappings:
+            db.session.bulk_update_mappings(cls, mappings)
+            db.session.commit()
+
     def calculate_completeness(self):
         score = 0
         if self.phone: score += 10
@@ -28,3 +71,28 @@ class Profile(db.Model):
         
         self.completeness = score
         return score
+
+
+@event.listens_for(Session, 'before_flush')
+def _sync_legacy_keys(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Profile):
+            state = db.inspect(obj)
+            if state.pending or state.attrs.phone.history.has_changes() or state.attrs.user_id.history.has_changes():
+                obj.refresh_legacy_key()
+        elif isinstance(obj, User) and db.inspect(obj).attrs.first_name.history.has_changes():
+            if obj.profile is not None:
+                obj.profile.refresh_legacy_key(obj.first_name)
+
+
+@event.listens_for(Session, 'before_flush')
+def _touch_profiles(session, flush_context, instances):
+    from .education import Education
+    from .experience import Experience
+
+    now = datetime.utcnow()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Experience, Education)):
+            profile = obj.profile or (db.session.get(Profile, obj.profile_id) if obj.profile_id else None)
+            if profile is not None and profile not in session.deleted:
+                profile.updated_at = now
@@ -5,7 +5,7 @@ from werkzeug.security import generate_password_hash, check_password_hash
 class User(db.Model):
     __tablename__ = 'users'
     id = db.Column(db.Integer, primary_key=True)
-    first_name = db.Column(db.String(80), nullable=False)
+    first_name = db.Column(db.String(80), nullable=False, index=True)
     last_name = db.Column(db.String(80), nullable=False)
     company_name = db.Column(db.String(120))
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -18,6 +18,7 @@ class User(db.Model):
     employee = db.relationship('Employee', uselist=False, back_populates='user', cascade='all, delete-orphan')
     chat_messages = db.relationship('ChatMessage', back_populates='user', cascade='all, delete-orphan')
     jobs_posted = db.relationship('Job', back_populates='posted_by_user', cascade='all, delete-orphan')
+    match_scores = db.relationship('MatchScore', back_populates='user', cascade='all, delete-orphan', passive_deletes=True)
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
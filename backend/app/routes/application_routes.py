@@ -1,11 +1,12 @@
 from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import and_, func
+from sqlalchemy.exc import IntegrityError
 from ..database import db
-from ..models import Application, User, Job
-from ..utils import get_current_user
+from ..models import Application, User, Job, Interview
+from ..utils import get_current_user, paginate_keyset
 from ..services.matching_service import matching_service
 import json
 import os
-from pypdf import PdfReader
 
 application_bp = Blueprint('application_bp', __name__)
 
@@ -49,42 +50,18 @@ def create_application():
 
     # Calculate Match Score & Explanation
     score = 0
-    resume_text = ""
     used_resume_file = False
 
-    # Check if a resume file exists in the profile
-    if user.profile.resume:
-        try:
-            # profile.resume is stored as "/uploads/filename"
-            # We need the physical path: current_app.root_path + /uploads/filename
-            # Strip leading slash to join correctly
-            filename = os.path.basename(user.profile.resume)
-            file_path = os.path.join(current_app.root_path, 'uploads', filename)
-            
-            if os.path.exists(file_path):
-                # Extract Text from File
-                if file_path.lower().endswith('.pdf'):
-                    reader = PdfReader(file_path)
-                    for page in reader.pages:
-                        extracted = page.extract_text()
-                        if extracted:
-                            resume_text += extracted + "\n"
-                else:
-                    # Fallback for text/md files
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        resume_text = f.read()
-                
-                # If text was successfully extracted, parse it with LLM
-                if resume_text.strip():
-                    resume_data = matching_service.parse_resume_with_llm(resume_text)
-                    if resume_data:
-                        score = matching_service.calculate_score(resume_data, job)
-                        used_resume_file = True
-                        print(f"Calculated score {score} using uploaded resume.")
-
-        except Exception as e:
-            print(f"Error parsing resume file for application: {e}")
-            # Silently fall back to profile data
+    # Score against the uploaded resume when there is one
+    try:
+        resume_data = matching_service.parse_stored_resume(user.profile, os.path.join(current_app.root_path, 'uploads'))
+        if resume_data:
+            score = matching_service.calculate_score(resume_data, job)
+            used_resume_file = True
+            print(f"Calculated score {score} using uploaded resume.")
+    except Exception as e:
+        print(f"Error parsing resume file for application: {e}")
+        # Silently fall back to profile data
     
     # Fallback: If no resume file or parsing failed, use the database profile
     if not used_resume_file:
@@ -100,21 +77,33 @@ def create_application():
     )
     # TODO: Handle cover_letter if model supports
     db.session.add(app)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent request for the same job won the race (unique user_id + job_id)
+        db.session.rollback()
+        return jsonify({'error': 'You have already applied to this job'}), 400
     return jsonify({'message': 'Application submitted successfully', 'id': app.id}), 201
 
+# Keyset order of a candidate's applications, newest first
+MY_APPLICATIONS_ORDER = [(Application.applied_at, True), (Application.id, True)]
+
+def my_applications_query(user_id, status=None):
+    query = Application.query.filter_by(user_id=user_id)
+    if status:
+        query = query.filter_by(status=status)
+    return query
+
 @application_bp.route('/applications/my', methods=['GET'])
 def get_my_applications():
     user = get_current_user()
     if not user:
         return jsonify({'error': 'Unauthorized'}), 401
 
-    status_filter = request.args.get('status')
-    query = Application.query.filter_by(user_id=user.id)
-    if status_filter:
-        query = query.filter_by(status=status_filter)
-
-    applications = query.all()
+    # Newest first, a page at a time (?limit= / ?cursor=, next cursor in X-Next-Cursor)
+    applications, next_cursor = paginate_keyset(
+        my_applications_query(user.id, request.args.get('status')), 'my-applications', MY_APPLICATIONS_ORDER
+    )
     enriched = []
     for app in applications:
         job = app.job
@@ -139,7 +128,10 @@ def get_my_applications():
                 'benefits': job.benefits if job else ''
             }
         })
-    return jsonify(enriched)
+    response = jsonify(enriched)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
 @application_bp.route('/applications/my/<int:app_id>', methods=['GET'])
 def get_my_application(app_id):
@@ -197,6 +189,54 @@ def submit_screening_form(app_id):
 
 # --- HR - Applications Endpoints ---
 
+def hr_board_query(hr_id, job_id=None, status=None, include_analysis=False):
+    """
+    The HR applications board as one statement (unordered): applications to this HR's jobs
+    + candidate name + job + latest interview, only the board's columns.
+    """
+    # Latest interview per application (window function), limited to this HR's jobs (or the one job asked for)
+    latest_interview = (db.session.query(
+            Interview.application_id,
+            Interview.scheduled_at,
+            Interview.location_type,
+            Interview.location_detail,
+            func.row_number().over(
+                partition_by=Interview.application_id,
+                order_by=(Interview.scheduled_at.desc(), Interview.id.desc())
+            ).label('rank'))
+        .join(Application, Application.id == Interview.application_id)
+        .join(Job, Job.id == Application.job_id)
+        .filter(Job.posted_by == hr_id, *([Application.job_id == job_id] if job_id else []))
+        .subquery())
+
+    columns = [
+        Application.id, Application.user_id, Application.job_id, Application.status,
+        Application.applied_at, Application.match_score, User.first_name, User.last_name,
+        Job.title.label('job_title'), Job.description.label('job_description'),
+        latest_interview.c.scheduled_at, latest_interview.c.location_type, latest_interview.c.location_detail
+    ]
+    if include_analysis:
+        columns.append(Application.match_explanation)
+
+    query = (db.session.query(*columns)
+             .join(Job, Job.id == Application.job_id)
+             .outerjoin(User, User.id == Application.user_id)
+             .outerjoin(latest_interview, and_(latest_interview.c.application_id == Application.id,
+                                               latest_interview.c.rank == 1))
+             .filter(Job.posted_by == hr_id))
+    if job_id:
+        query = query.filter(Application.job_id == job_id)
+    if status:
+        query = query.filter(Application.status == status)
+    return query
+
+def hr_board_order(sort, descending):
+    """
+    Keyset order of the board: match_score or applied_at, then id.
+    """
+    sort_key = Application.match_score if sort == 'match_score' else Application.applied_at
+    return [(sort_key, descending), (Application.id, descending)]
+
 @application_bp.route('/hr/applications', methods=['GET'])
 def get_company_applications():
     user = get_current_user()
@@ -205,49 +245,49 @@ def get_company_applications():
 
     job_id = request.args.get('job_id')
     status = request.args.get('status')
+    sort = request.args.get('sort', 'applied_at')
+    descending = request.args.get('order', 'desc') != 'asc'
+    include = set(request.args.get('include', '').split(','))
+
+    # Sorted in SQL (match_score or applied_at) and paged with ?limit= / ?cursor=;
+    # with ?job_id= both orders are read straight off the (job_id, key, id) indexes
+    rows, next_cursor = paginate_keyset(
+        hr_board_query(user.id, job_id=job_id, status=status, include_analysis='analysis' in include),
+        f"hr-applications:{sort}:{int(descending)}", hr_board_order(sort, descending)
+    )
 
-    query = Application.query.join(Job).filter(Job.posted_by == user.id)
-    if job_id:
-        query = query.filter(Application.job_id == job_id)
-    if status:
-        query = query.filter(Application.status == status)
-
-    applications = query.all()
     enriched = []
-    for app in applications:
-        job = app.job
-        user = User.query.get(app.user_id)
-
-        try:
-            analysis = json.loads(app.match_explanation) if app.match_explanation else None
-        except:
-            analysis = None
-
-        # Fetch Interview Details
+    for row in rows:
         interview_info = None
-        if app.interviews:
-            # Sort to get the latest interview
-            latest_interview = sorted(app.interviews, key=lambda x: x.scheduled_at, reverse=True)[0]
+        if row.scheduled_at:
             interview_info = {
-                'scheduled_at': latest_interview.scheduled_at.isoformat(),
-                'location_type': latest_interview.location_type,
-                'location_detail': latest_interview.location_detail
+                'scheduled_at': row.scheduled_at.isoformat(),
+                'location_type': row.location_type,
+                'location_detail': row.location_detail
             }
 
-        enriched.append({
-            'id': app.id,
-            'user_id': app.user_id,
-            'job_id': app.job_id,
-            'status': app.status,
-            'applied_at': app.applied_at,
-            'candidate_name': f"{user.first_name} {user.last_name}" if user else 'Unknown',
-            'job_title': job.title if job else '',
-            'job_description': job.description if job else '',
-            'match_score': app.match_score,
-            'match_analysis': analysis,
-            'interview_details': interview_info # Added interview info
-        })
-    return jsonify({'pagination': {}, 'applications': enriched})
+        app_data = {
+            'id': row.id,
+            'user_id': row.user_id,
+            'job_id': row.job_id,
+            'status': row.status,
+            'applied_at': row.applied_at,
+            'candidate_name': f"{row.first_name} {row.last_name}" if row.first_name is not None else 'Unknown',
+            'job_title': row.job_title or '',
+            'job_description': row.job_description or '',
+            'match_score': row.match_score or 0.0,
+            'interview_details': interview_info
+        }
+
+        # The stored analysis is only parsed when asked for (?include=analysis)
+        if 'analysis' in include:
+            try:
+                app_data['match_analysis'] = json.loads(row.match_explanation) if row.match_explanation else None
+            except ValueError:
+                app_data['match_analysis'] = None
+
+        enriched.append(app_data)
+    return jsonify({'pagination': {'next_cursor': next_cursor}, 'applications': enriched})
 
 @application_bp.route('/hr/applications/<int:app_id>', methods=['GET'])
 def get_application_hr(app_id):
@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify, redirect, url_for, session
 from app.models.user import User
 from app.models.employee import Employee
+from app.models.profile import Profile
 from app import db
+from app.utils import paginate_keyset, get_bearer_token, decode_token
+from sqlalchemy import func, or_
 import jwt
 import datetime
 from flask import current_app
@@ -80,17 +83,15 @@ def login():
 @auth_bp.route('/change-password', methods=['PUT'])
 def change_password():
     # Verify Token
-    auth_header = request.headers.get('Authorization', None)
-    if not auth_header or not auth_header.startswith('Bearer '):
+    token = get_bearer_token()
+    if not token:
         return jsonify({'error': 'Missing or invalid token'}), 401
-    token = auth_header.split(' ')[1]
-    try:
-        payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-        user = User.query.get(payload.get('user_id'))
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-    except Exception:
+    payload = decode_token(token)
+    if not payload:
         return jsonify({'error': 'Invalid token'}), 401
+    user = db.session.get(User, payload['user_id'])
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
 
     data = request.json
     current_password = data.get('current_password')
@@ -162,45 +163,55 @@ def google_register():
 # Get current user info from JWT
 @auth_bp.route('/me', methods=['GET'])
 def get_current_user():
-    auth_header = request.headers.get('Authorization', None)
-    if not auth_header or not auth_header.startswith('Bearer '):
+    token = get_bearer_token()
+    if not token:
         return jsonify({'error': 'Missing or invalid token'}), 401
-    token = auth_header.split(' ')[1]
-    try:
-        payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-        user = User.query.get(payload.get('user_id'))
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        return jsonify({
-            'id': user.id,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'company_name': user.company_name,
-            'email': user.email,
-            'role': user.role
-        })
-    except Exception as e:
+    payload = decode_token(token)
+    if not payload:
         return jsonify({'error': 'Invalid token'}), 401
+    user = db.session.get(User, payload['user_id'])
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    return jsonify({
+        'id': user.id,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'company_name': user.company_name,
+        'email': user.email,
+        'role': user.role
+    })
     
 
 @auth_bp.route('/users/basic', methods=['GET'])
 def get_users_basic():
-    # Only fetch users with role 'candidate'
-    users = User.query.filter_by(role='candidate').all()
-    result = []
-    for user in users:
-        phone = ''
-        if user.profile:
-            phone = user.profile.phone or ''
-        # Find employee record by querying Employee table directly
-        employee = Employee.query.filter_by(user_id=str(user.id)).first()
-        employee_id = employee.id if employee else None
-        result.append({
-            'id': user.id,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'email': user.email,
-            'phone': phone,
-            'employee_id': employee_id
-        })
-    return jsonify(result)
\ No newline at end of file
+    # Candidates with their phone and employee record (if hired), in one query.
+    # A user can have several employee rows: join one per user so the keyset on User.id stays unique.
+    employees = (db.session.query(Employee.user_id, func.min(Employee.id).label('employee_id'))
+                 .group_by(Employee.user_id)
+                 .subquery())
+    query = (db.session.query(User.id, User.first_name, User.last_name, User.email,
+                              Profile.phone, employees.c.employee_id)
+             .outerjoin(Profile, Profile.user_id == User.id)
+             .outerjoin(employees, employees.c.user_id == User.id)
+             .filter(User.role == 'candidate'))
+
+    # Optional ?q= prefix filter on first name, last name or email
+    q = request.args.get('q', '').strip()
+    if q:
+        prefix = q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        query = query.filter(or_(*[column.ilike(prefix, escape='\\')
+                                   for column in (User.first_name, User.last_name, User.email)]))
+
+    # A page at a time (?limit= / ?cursor=, next cursor in X-Next-Cursor)
+    rows, next_cursor = paginate_keyset(query, 'users-basic', [(User.id, False)])
+    response = jsonify([{
+        'id': row.id,
+        'first_name': row.first_name,
+        'last_name': row.last_name,
+        'email': row.email,
+        'phone': row.phone or '',
+        'employee_id': row.employee_id
+    } for row in rows])
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
\ No newline at end of file
@@ -1,50 +1,82 @@
 import os
 from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import and_
 from ..database import db
 from ..models import Employee, Performance, User, Profile
-from ..utils import get_current_user
+from ..utils import get_current_user, paginate_keyset
+from ..services.performance_stats import rating_stats_subquery, ranked_reviews_subquery
 
 employee_bp = Blueprint('employee_bp', __name__)
 
 # --- HR - Employee Endpoints ---
 
+# Keyset order of the roster
+ROSTER_ORDER = [(Employee.id, False)]
+
+def roster_query(hr_id):
+    """
+    One statement: employees hired by this HR + user/profile fields + review aggregates
+    and the latest review (grouped / window subqueries) instead of every review row.
+    """
+    stats = rating_stats_subquery(hr_id)
+    latest = ranked_reviews_subquery(hr_id)
+    return (db.session.query(
+               Employee.id, Employee.user_id, Employee.job_title, Employee.department,
+               Employee.job_location, Employee.employment_type, Employee.salary,
+               Employee.hired_at, Employee.photo,
+               User.first_name, User.last_name, User.email, Profile.phone,
+               stats.c.avg_rating, stats.c.review_count,
+               latest.c.rating.label('latest_rating'),
+               latest.c.date.label('latest_date'),
+               latest.c.comments.label('latest_comments'))
+            .outerjoin(User, User.id == Employee.user_id)
+            .outerjoin(Profile, Profile.user_id == User.id)
+            .outerjoin(stats, stats.c.employee_id == Employee.id)
+            .outerjoin(latest, and_(latest.c.employee_id == Employee.id, latest.c.review_rank == 1))
+            .filter(Employee.hired_by == hr_id))
+
 @employee_bp.route('/hr/employees', methods=['GET'])
 def get_employees():
     user = get_current_user()
     if not user or user.role != 'hr':
         return jsonify({'error': 'Unauthorized: HR role required'}), 403
 
-    # Fetch all employees hired by this HR
-    employees = Employee.query.filter_by(hired_by=user.id).all()
+    employees, next_cursor = paginate_keyset(roster_query(user.id), 'hr-employees', ROSTER_ORDER)
+
+    # Full review history only on request (?include=performances), in one query for the page
+    include_history = 'performances' in request.args.get('include', '').split(',')
+    history = {}
+    if include_history:
+        page_ids = [e.id for e in employees]
+        for p in Performance.query.filter(Performance.employee_id.in_(page_ids)).order_by(Performance.id) if page_ids else []:
+            history.setdefault(p.employee_id, []).append({
+                'id': p.id,
+                'date': p.date.isoformat() if p.date else None,
+                'rating': p.rating,
+                'comments': p.comments
+            })
 
     employee_list = []
     for e in employees:
-        user_obj = e.user 
-        full_name = f"{user_obj.first_name} {user_obj.last_name}" if user_obj else "Unknown"
-        
-        # Calculate Average Rating
-        ratings = [p.rating for p in e.performances if p.rating]
-        avg_rating = round(sum(ratings) / len(ratings), 1) if ratings else 0
-
-        # Get Latest Review
+        has_user = e.first_name is not None
+        full_name = f"{e.first_name} {e.last_name}" if has_user else "Unknown"
+
         latest_review = None
-        if e.performances:
-            # Sort by date descending
-            sorted_perfs = sorted(e.performances, key=lambda x: x.date, reverse=True)
+        if e.latest_date:
             latest_review = {
-                'rating': sorted_perfs[0].rating,
-                'date': sorted_perfs[0].date.isoformat(),
-                'comments': sorted_perfs[0].comments
+                'rating': e.latest_rating,
+                'date': e.latest_date.isoformat(),
+                'comments': e.latest_comments
             }
 
-        employee_list.append({
+        employee_data = {
             'id': e.id,
             'user_id': e.user_id,
-            'first_name': user_obj.first_name if user_obj else "",
-            'last_name': user_obj.last_name if user_obj else "",
+            'first_name': e.first_name if has_user else "",
+            'last_name': e.last_name if has_user else "",
             'name': full_name,
-            'email': user_obj.email if user_obj else "",
-            'phone': user_obj.profile.phone if (user_obj and user_obj.profile) else "",
+            'email': e.email if has_user else "",
+            'phone': e.phone or "",
             'job_title': e.job_title,
             'department': e.department,
             'job_location': e.job_location,
@@ -52,17 +84,18 @@ def get_employees():
             'salary': e.salary,
             'hired_at': e.hired_at,
             'photo_url': e.photo,
-            'manager_id': getattr(e, 'manager_id', None),
-            'performance_avg': avg_rating,
-            'performances': [{
-                'id': p.id,
-                'date': p.date.isoformat(),
-                'rating': p.rating,
-                'comments': p.comments
-            } for p in e.performances]
-        })
+            'manager_id': None,
+            'performance_avg': round(e.avg_rating, 1) if e.avg_rating else 0,
+            'review_count': e.review_count or 0,
+            'latest_review': latest_review
+        }
+        if include_history:
+            employee_data['performances'] = history.get(e.id, [])
+
+        employee_list.append(employee_data)
 
     return jsonify({
+        'pagination': {'next_cursor': next_cursor},
         'employees': employee_list
     })
 
@@ -1,9 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from ..services.llm_service import llm_service
 from ..services.matching_service import matching_service
 from ..models import Job, Application, User, ChatMessage, Employee # Added Employee
 from ..database import db
-from ..utils import get_current_user
+from ..utils import get_current_user, paginate_keyset
+from ..services.performance_stats import rating_stats_subquery, ranked_reviews_subquery
 from ..genai_helpers import handle_data_query, KNOWLEDGE_BASE_HR, KNOWLEDGE_BASE_CANDIDATE
 import json
 import io
@@ -11,18 +12,10 @@ from pypdf import PdfReader
 
 genai_bp = Blueprint('genai_bp', __name__)
 
-@genai_bp.route('/gen-ai/chat', methods=['POST'])
-def chat_with_ai():
-    user = get_current_user()
-    if not user:
-        return jsonify({'error': 'Unauthorized'}), 401
-
-    data = request.json or {}
-    prompt = data.get('prompt')
-
-    if not prompt:
-        return jsonify({'error': 'Prompt is required'}), 400
-
+def _chat_prompts(user, prompt):
+    """
+    Saves the user's message (uncommitted) and builds the (system, user) prompts for the reply.
+    """
     # Select Role-Based Knowledge Base
     if user.role == 'hr':
         role_knowledge = KNOWLEDGE_BASE_HR
@@ -58,7 +51,23 @@ def chat_with_ai():
         # Inject the fetched data
         system_context += f"\n\n--- LIVE DATABASE CONTEXT ---\n{query_result['context']}"
         user_prompt_to_llm = query_result['prompt_extension']
-    
+
+    return system_context, user_prompt_to_llm
+
+@genai_bp.route('/gen-ai/chat', methods=['POST'])
+def chat_with_ai():
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    data = request.json or {}
+    prompt = data.get('prompt')
+
+    if not prompt:
+        return jsonify({'error': 'Prompt is required'}), 400
+
+    system_context, user_prompt_to_llm = _chat_prompts(user, prompt)
+
     # Generate Response
     reply = llm_service.generate_text(system_context, user_prompt_to_llm)
 
@@ -72,15 +81,67 @@ def chat_with_ai():
         'session_id': data.get('session_id', 'session_123'),
     })
 
+def _sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@genai_bp.route('/gen-ai/chat/stream', methods=['POST'])
+def chat_with_ai_stream():
+    """
+    Same as /gen-ai/chat, but the reply is streamed as Server-Sent Events:
+    `token` events ({"text"}) as it is generated, then `done` ({"reply", "session_id"})
+    or `error` ({"error"}). The assembled reply is saved when the stream ends.
+    """
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    data = request.json or {}
+    prompt = data.get('prompt')
+
+    if not prompt:
+        return jsonify({'error': 'Prompt is required'}), 400
+
+    system_context, user_prompt_to_llm = _chat_prompts(user, prompt)
+    user_id = user.id
+    # Commit now so no write transaction stays open while the reply streams
+    db.session.commit()
+
+    def events():
+        parts = []
+        try:
+            for text in llm_service.stream_text(system_context, user_prompt_to_llm):
+                parts.append(text)
+                yield _sse('token', {'text': text})
+            yield _sse('done', {'reply': ''.join(parts), 'session_id': data.get('session_id', 'session_123')})
+        except Exception as e:
+            print(f"Chat stream failed: {e}")
+            yield _sse('error', {'error': 'The assistant is unavailable, please try again.'})
+        finally:
+            # Also runs if the client disconnects: keep whatever part of the reply was shown
+            if parts:
+                db.session.add(ChatMessage(user_id=user_id, sender='bot', message=''.join(parts)))
+                db.session.commit()
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no' # don't let a reverse proxy buffer the stream
+    })
+
 # --- Get Chat History ---
+# Keyset order of the chat history, newest first
+CHAT_HISTORY_ORDER = [(ChatMessage.timestamp, True), (ChatMessage.id, True)]
+
 @genai_bp.route('/gen-ai/history', methods=['GET'])
 def get_chat_history():
     user = get_current_user()
     if not user:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    # Fetch all messages for this user, sorted by time
-    messages = ChatMessage.query.filter_by(user_id=user.id).order_by(ChatMessage.timestamp.asc()).all()
+    # The latest page of messages; X-Next-Cursor (passed back as ?cursor=) walks back to older ones
+    messages, next_cursor = paginate_keyset(
+        ChatMessage.query.filter_by(user_id=user.id), 'chat-history', CHAT_HISTORY_ORDER
+    )
+    messages.reverse() # shown oldest first
     
     history = [{
         'sender': msg.sender,
@@ -88,7 +149,10 @@ def get_chat_history():
         'timestamp': msg.timestamp
     } for msg in messages]
     
-    return jsonify(history)
+    response = jsonify(history)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
 # --- Clear Chat History ---
 @genai_bp.route('/gen-ai/history', methods=['DELETE'])
@@ -182,7 +246,7 @@ def generate_jd():
     Ensure the description and requirements align with these specific details.
     """
 
-    response_text = llm_service.generate_text(system_prompt, user_prompt)
+    response_text = llm_service.generate_text(system_prompt, user_prompt, cache='jd', expects_json=True)
 
     # Clean up markdown if Gemini adds it despite instructions
     if response_text.startswith("```json"):
@@ -266,7 +330,7 @@ def generate_interview_guide():
 
     user_prompt = f"JD: {jd_text}"
 
-    response_text = llm_service.generate_text(system_prompt, user_prompt)
+    response_text = llm_service.generate_text(system_prompt, user_prompt, cache='interview-guide', expects_json=True)
 
     # Clean up markdown if Gemini adds it despite instructions
     if response_text.startswith("```json"):
@@ -356,7 +420,7 @@ def start_mock_interview():
     
     user_prompt = f"Role: {job.title}\nCompany: {job.company}\nDescription: {job.description[:500]}..."
 
-    response_text = llm_service.generate_text(system_prompt, user_prompt)
+    response_text = llm_service.generate_text(system_prompt, user_prompt, cache='mock-interview', expects_json=True)
     
     # Cleanup & Parse
     if response_text.startswith("```json"):
@@ -433,40 +497,42 @@ def generate_performance_insights():
     if not user or user.role != 'hr':
         return jsonify({'error': 'Unauthorized'}), 403
 
-    # 1. Fetch Data
-    employees = Employee.query.filter_by(hired_by=user.id).all()
-    if not employees:
+    # 1. Fetch Data: per-employee averages and the 2 latest reviews, aggregated in SQL
+    if not Employee.query.filter_by(hired_by=user.id).first():
         return jsonify([])
 
-    # 2. Pre-process Stats (Python side)
+    stats = rating_stats_subquery(user.id)
+    employee_averages = (db.session.query(Employee.department, stats.c.avg_rating)
+                         .join(stats, stats.c.employee_id == Employee.id)
+                         .filter(Employee.hired_by == user.id, stats.c.avg_rating.isnot(None))
+                         .all())
+
+    ranked = ranked_reviews_subquery(user.id)
+    latest_reviews = (db.session.query(Employee.department, ranked.c.comments)
+                      .join(ranked, ranked.c.employee_id == Employee.id)
+                      .filter(ranked.c.review_rank <= 2, ranked.c.comments.isnot(None), ranked.c.comments != '')
+                      .order_by(Employee.id, ranked.c.review_rank)
+                      .limit(15)
+                      .all())
+
+    # 2. Pre-process Stats
     dept_scores = {}
-    recent_comments = []
     total_rating = 0
     rating_count = 0
     
-    for emp in employees:
-        emp_ratings = [p.rating for p in emp.performances if p.rating]
-        if emp_ratings:
-            avg = sum(emp_ratings) / len(emp_ratings)
-            
-            # Dept Stats
-            dept = emp.department or "Unknown"
-            if dept not in dept_scores:
-                dept_scores[dept] = {'sum': 0, 'count': 0}
-            dept_scores[dept]['sum'] += avg
-            dept_scores[dept]['count'] += 1
-            
-            total_rating += avg
-            rating_count += 1
-
-        # Collect last 2 comments per employee
-        if emp.performances:
-            sorted_reviews = sorted(emp.performances, key=lambda x: x.date, reverse=True)
-            for p in sorted_reviews[:2]:
-                if p.comments:
-                    recent_comments.append(f"[{emp.department}] {p.comments}")
-
-    recent_comments = recent_comments[:15]
+    for department, avg in employee_averages:
+        # Dept Stats
+        dept = department or "Unknown"
+        if dept not in dept_scores:
+            dept_scores[dept] = {'sum': 0, 'count': 0}
+        dept_scores[dept]['sum'] += avg
+        dept_scores[dept]['count'] += 1
+        
+        total_rating += avg
+        rating_count += 1
+
+    # Last 2 comments per employee
+    recent_comments = [f"[{department}] {comments}" for department, comments in latest_reviews]
 
     # 3. Construct Context
     dept_summary = ", ".join([
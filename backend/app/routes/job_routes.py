@@ -1,40 +1,73 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy import func, literal
+from sqlalchemy.orm import selectinload
 from ..database import db
-from ..models import Job
+from ..models import Job, User, Application
 from ..utils import get_current_user
 from ..services.matching_service import matching_service
+from ..services.match_store import match_store
+from ..services.job_search import job_search
+from ..config import Config
 import json
 
 job_bp = Blueprint('job_bp', __name__)
 
 # --- Job Seeker - Jobs Endpoints ---
 
+def _applications_count_column():
+    """
+    Per-job application count as a correlated subquery: counted off the job_id index,
+    and only for the jobs actually listed.
+    """
+    return (db.select(func.count(Application.id))
+            .where(Application.job_id == Job.id)
+            .correlate(Job)
+            .scalar_subquery())
+
+def jobs_listing_query(user_id=None):
+    """
+    (Job, match score, applications count) rows of the job listing: best match first from a
+    candidate's stored scores, or by id with no score.
+    """
+    if user_id is not None:
+        query = match_store.ranked_jobs_query(user_id)
+    else:
+        query = db.session.query(Job, literal(None)).order_by(Job.id.asc())
+    return query.add_columns(_applications_count_column())
+
 @job_bp.route('/jobs', methods=['GET'])
 def get_jobs():
     # Helper for pagination
-    page = request.args.get('page', 1, type=int)
+    page = max(request.args.get('page', 1, type=int), 1)
     limit_param = request.args.get('limit', type=int)
+    if limit_param is not None:
+        # Postgres rejects a negative LIMIT/OFFSET
+        limit_param = min(max(limit_param, 1), 100)
 
-    jobs = Job.query.all() 
+    total_items = db.session.query(func.count(Job.id)).scalar()
 
     if limit_param:
         limit = limit_param
         start = (page - 1) * limit
-        end = start + limit
-        paginated_jobs = jobs[start:end]
-        total_pages = (len(jobs) + limit - 1) // limit
+        total_pages = (total_items + limit - 1) // limit
     else:
         # Show all jobs if no limit provided
-        paginated_jobs = jobs
-        limit = len(jobs)
+        limit = total_items
         total_pages = 1
 
     # Check for authenticated user to calculate match score
     user = get_current_user()
     profile = user.profile if user else None
 
+    if profile:
+        # Match-sorted page straight from the stored scores (missing rows are scored first)
+        match_store.ensure_scores(user.id, profile)
+    query = jobs_listing_query(user.id if profile else None)
+    if limit_param:
+        query = query.offset(start).limit(limit)
+
     job_list = []
-    for job in paginated_jobs:
+    for job, score, job_applications in query.all():
         job_data = {
             'id': job.id,
             'title': job.title,
@@ -52,29 +85,20 @@ def get_jobs():
             'tags': job.tags.split(',') if job.tags else [],
             'created_at': job.created_at,
             'company_logo_url': getattr(job, 'company_logo_url', ''),
-            'applications_count': len(job.applications)
+            'applications_count': job_applications
         }
 
-        # Calculate AI Match Score if user profile exists
+        # Attach AI Match Score if user profile exists
         if profile:
-            try:
-                score = matching_service.calculate_score(profile, job)
-                job_data['match_score'] = score
-            except Exception as e:
-                print(f"Error calculating score for job {job.id}: {e}")
-                job_data['match_score'] = 0
+            job_data['match_score'] = score
 
         job_list.append(job_data)
 
-    # Sort by match score if user is logged in
-    if profile:
-        job_list.sort(key=lambda x: x.get('match_score', 0), reverse=True)
-
     return jsonify({
         'pagination': {
             'page': page,
-            'per_page': limit if limit else len(jobs),
-            'total_items': len(jobs),
+            'per_page': limit,
+            'total_items': total_items,
             'total_pages': total_pages
         },
         'jobs': job_list
@@ -85,28 +109,31 @@ def search_jobs():
     q = request.args.get('q', '').lower()
     location = request.args.get('location', '').lower()
     
-    all_jobs = Job.query.all()
-    filtered = []
-    
     # Check for authenticated user
     user = get_current_user()
     profile = user.profile if user else None
 
-    for job in all_jobs:
-        match = True
-        if q:
-            text = (job.title + job.description + (job.tags or '')).lower()
-            if q not in text:
-                match = False
+    snippets = {}
+    if q:
+        # Full-text index: every term (as a prefix), best text match first, top hits only
+        hits = job_search.search(q, location=location or None, limit=Config.SEARCH_MAX_HITS)
+        # Only counted separately when the cap cut the hits short
+        total_items = len(hits) if len(hits) < Config.SEARCH_MAX_HITS else job_search.count(q, location=location or None)
+        snippets = dict(hits)
+        jobs_by_id = {job.id: job for job in Job.query.filter(Job.id.in_(snippets.keys()))} if hits else {}
+        filtered = [jobs_by_id[job_id] for job_id, _ in hits if job_id in jobs_by_id]
+    else:
+        query = Job.query
         if location:
-            if location not in (job.location or '').lower():
-                match = False
+            query = query.filter(Job.location.ilike(f'%{location}%'))
+        filtered = query.order_by(Job.id).all()
+        total_items = len(filtered)
 
-        if match:
-            filtered.append(job)
+    # Match scores (and the re-ranking below) only cover the search hits
+    scores = matching_service.score_many(profile, filtered) if profile else []
 
     job_list = []
-    for job in filtered:
+    for idx, job in enumerate(filtered):
         job_data = {
             'title': job.title,
             'company': job.company,
@@ -126,20 +153,19 @@ def search_jobs():
         }
         
         if profile:
-            try:
-                score = matching_service.calculate_score(profile, job)
-                job_data['match_score'] = score
-            except:
-                job_data['match_score'] = 0
+            job_data['match_score'] = scores[idx]
+        if snippets.get(job.id):
+            job_data['snippet'] = snippets[job.id]
         
         job_list.append(job_data)
 
-    # Sort by match score
+    # Sort by match score (stable, so equal scores keep the text-relevance order)
     if profile:
         job_list.sort(key=lambda x: x.get('match_score', 0), reverse=True)
 
+    # total_items counts every match; with `truncated` only the top SEARCH_MAX_HITS are listed
     return jsonify({
-        'pagination': {'total_items': len(job_list)},
+        'pagination': {'total_items': total_items, 'truncated': total_items > len(job_list)},
         'jobs': job_list
     })
 
@@ -199,6 +225,55 @@ def get_my_jobs():
 
     return jsonify({'jobs': job_list})
 
+@job_bp.route('/hr/jobs/<int:job_id>/top-candidates', methods=['GET'])
+def get_top_candidates(job_id):
+    user = get_current_user()
+    if not user or user.role != 'hr':
+        return jsonify({'error': 'Unauthorized: HR role required'}), 403
+
+    job = Job.query.get_or_404(job_id)
+    if job.posted_by != user.id:
+        return jsonify({'error': 'Forbidden'}), 403
+
+    page = max(request.args.get('page', 1, type=int), 1)
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    min_score = request.args.get('min_score', 0, type=float)
+
+    # Ranks every candidate profile against this job in one batched pass
+    total, ranked = match_store.top_candidates(job, min_score=min_score, page=page, limit=limit)
+
+    user_ids = [user_id for user_id, _ in ranked]
+    users = {u.id: u for u in User.query.options(selectinload(User.profile)).filter(User.id.in_(user_ids))} if user_ids else {}
+    applied = {row.user_id for row in Application.query.filter(
+        Application.job_id == job_id, Application.user_id.in_(user_ids)
+    ).with_entities(Application.user_id)} if user_ids else set()
+
+    candidates = []
+    for user_id, score in ranked:
+        candidate = users.get(user_id)
+        if not candidate:
+            continue
+        candidates.append({
+            'user_id': user_id,
+            'first_name': candidate.first_name,
+            'last_name': candidate.last_name,
+            'full_name': f"{candidate.first_name} {candidate.last_name}",
+            'email': candidate.email,
+            'location': candidate.profile.location if candidate.profile else None,
+            'match_score': score,
+            'has_applied': user_id in applied
+        })
+
+    return jsonify({
+        'pagination': {
+            'page': page,
+            'per_page': limit,
+            'total_items': total,
+            'total_pages': (total + limit - 1) // limit
+        },
+        'candidates': candidates
+    })
+
 @job_bp.route('/hr/jobs', methods=['POST'])
 def create_job():
     user = get_current_user()
@@ -225,6 +300,10 @@ def create_job():
     )
     db.session.add(job)
     db.session.commit()
+
+    # Precompute scoring features so listings don't re-parse this posting
+    matching_service.index_job(job)
+    match_store.enqueue_job(job.id)
     return jsonify({'message': 'Job created successfully', 'id': job.id}), 201
 
 @job_bp.route('/hr/jobs/<int:job_id>', methods=['PUT'])
@@ -248,6 +327,10 @@ def update_job(job_id):
     if 'application_deadline' in data: job.application_deadline = data['application_deadline']
 
     db.session.commit()
+
+    # Rebuild scoring features from the updated title/tags/description
+    matching_service.index_job(job)
+    match_store.enqueue_job(job.id)
     return jsonify({'message': 'Job updated successfully'})
 
 @job_bp.route('/hr/jobs/<int:job_id>', methods=['DELETE'])
@@ -256,6 +339,7 @@ def delete_job(job_id):
     job = Job.query.get_or_404(job_id)
     db.session.delete(job)
     db.session.commit()
+    matching_service.remove_job(job_id)
     return jsonify({'message': 'Job deleted successfully'})
 
 @job_bp.route('/jobs/recommendations', methods=['GET'])
@@ -268,37 +352,30 @@ def get_job_recommendations():
     if not profile:
         return jsonify({'error': 'Profile required for recommendations'}), 400
 
-    jobs = Job.query.all()
+    # Top 5 above 70% (Lowered threshold slightly to ensure results)
+    rows = match_store.recommend(user.id, profile, limit=5, min_score=70)
+
     recommended = []
+    for job, score in rows:
+        job_data = {
+            'id': job.id,
+            'title': job.title,
+            'company': job.company,
+            'location': job.location,
+            'type': job.type,
+            'salary': job.salary,
+            'description': job.description,
+            'experience_level': job.experience_level,
+            'education': job.education,
+            'remote_option': job.remote_option,
+            'benefits': job.benefits,
+            'tags': job.tags.split(',') if job.tags else [],
+            'match_score': score
+        }
+        recommended.append(job_data)
 
-    for job in jobs:
-        # Calculate score locally (fast)
-        score = matching_service.calculate_score(profile, job)
-        
-        # Only recommend if score > 70% (Lowered threshold slightly to ensure results)
-        if score > 70: 
-            job_data = {
-                'id': job.id,
-                'title': job.title,
-                'company': job.company,
-                'location': job.location,
-                'type': job.type,
-                'salary': job.salary,
-                'description': job.description,
-                'experience_level': job.experience_level,
-                'education': job.education,
-                'remote_option': job.remote_option,
-                'benefits': job.benefits,
-                'tags': job.tags.split(',') if job.tags else [],
-                'match_score': score
-            }
-            recommended.append(job_data)
-
-    # Sort by score descending
-    recommended.sort(key=lambda x: x['match_score'], reverse=True)
-    
     return jsonify({
-        'jobs': recommended[:5] # Return top 5
+        'jobs': recommended # Top 5
     })
 
 # Add this endpoint to get explanation for a specific job without applying
@@ -1,9 +1,28 @@
 from flask import Blueprint, request, jsonify
 from ..services.llm_service import llm_service
+from ..services.matching_service import matching_service
 from ..utils import get_current_user
+from pypdf import PdfReader
+from types import SimpleNamespace
+import re
 
 matching_bp = Blueprint('matching_bp', __name__)
 
+EMAIL_PATTERN = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+
+def _extract_resume_text(resume):
+    """
+    Reads the text of an uploaded resume (PDF, otherwise treated as plain text).
+    """
+    try:
+        if resume.filename.lower().endswith('.pdf'):
+            reader = PdfReader(resume.stream)
+            return "\n".join(page.extract_text() or '' for page in reader.pages)
+        return resume.read().decode('utf-8', errors='ignore')
+    except Exception as e:
+        print(f"Error reading resume {resume.filename}: {e}")
+        return ""
+
 @matching_bp.route('/hr/matching/rank-resumes', methods=['POST'])
 def rank_resumes():
     user = get_current_user()
@@ -19,27 +38,38 @@ def rank_resumes():
     if not job_description:
          return jsonify({'error': 'Job description is required'}), 400
 
-    # Mock Ranking Logic
+    # Ad-hoc job built from the form; title + tags are the keyword "must haves".
+    # Without them the description doubles as the keyword text.
+    job_title = request.form.get('job_title', '')
+    tags = request.form.get('tags', '')
+    job = SimpleNamespace(
+        id=None,
+        title=job_title,
+        tags=tags if (tags or job_title) else job_description,
+        description=job_description
+    )
+
+    texts = [_extract_resume_text(resume) for resume in resumes]
+
+    # All resumes are parsed in one batch and scored against the job together
+    results = matching_service.score_resume_texts(texts, job)
+
     ranked_candidates = []
-    for idx, resume in enumerate(resumes):
-        # In a real app, parse the PDF/DOCX content here
+    for idx, (resume, text, (score, matched, missing)) in enumerate(zip(resumes, texts, results)):
         filename = resume.filename
-
-        # Mock score based on filename length or random
-        import random
-        score = random.uniform(70, 99)
+        email = EMAIL_PATTERN.search(text)
 
         ranked_candidates.append({
             'rank': 0, # To be sorted
-            'match_score': round(score, 1),
+            'match_score': score,
             'file_name': filename,
-            'parsed_name': f"Candidate {idx+1}", # Mock
-            'parsed_email': f"candidate{idx+1}@example.com",
+            'parsed_name': f"Candidate {idx+1}",
+            'parsed_email': email.group(0) if email else None,
             'match_explanation': {
-                'summary': f"Good match for {filename}",
-                'matched_skills': ['Python', 'Communication'],
-                'missing_skills': ['Java'],
-                'experience_highlights': "5 years of experience."
+                'summary': f"Matches {len(matched)} of {len(matched) + len(missing)} key terms for this role.",
+                'matched_skills': matched,
+                'missing_skills': missing,
+                'experience_highlights': ""
             }
         })
 
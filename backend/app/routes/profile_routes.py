@@ -3,9 +3,18 @@ from flask import current_app, Blueprint, request, jsonify, g
 from ..database import db
 from ..models import Profile, Experience, Education, User
 from ..utils import get_current_user
+from ..services.matching_service import matching_service
+from ..services.match_store import match_store
 
 profile_bp = Blueprint('profile_bp', __name__)
 
+def _profile_changed(profile):
+    """
+    Drops cached matching features and rescores stored match scores for this profile.
+    """
+    matching_service.invalidate_profile(profile.id)
+    match_store.enqueue_user(profile.user_id)
+
 # --- Job Seeker - Profile Endpoints ---
 
 # GET /profiles/me
@@ -84,6 +93,7 @@ def profile_me():
     profile.calculate_completeness()
 
     db.session.commit()
+    _profile_changed(profile)
     return jsonify({'message': 'Profile updated successfully', 'completeness': profile.completeness})
 
 
@@ -162,6 +172,7 @@ def add_my_experience():
     db.session.flush()
     profile.calculate_completeness()
     db.session.commit()
+    _profile_changed(profile)
     return jsonify({'message': 'Experience added', 'id': e.id}), 201
 
 @profile_bp.route('/profiles/me/experiences/<int:exp_id>', methods=['PUT'])
@@ -184,6 +195,7 @@ def update_my_experience(exp_id):
 
     profile.calculate_completeness()
     db.session.commit()
+    _profile_changed(profile)
     return jsonify({'message': 'Experience updated'})
 
 @profile_bp.route('/profiles/me/experiences/<int:exp_id>', methods=['DELETE'])
@@ -201,6 +213,7 @@ def delete_my_experience(exp_id):
     db.session.flush()
     profile.calculate_completeness()
     db.session.commit()
+    _profile_changed(profile)
     return jsonify({'message': 'Experience deleted'})
 
 @profile_bp.route('/profiles/me/education', methods=['POST'])
@@ -223,6 +236,7 @@ def add_education():
     db.session.flush()
     profile.calculate_completeness()
     db.session.commit()
+    _profile_changed(profile)
     return jsonify({'message': 'Education added', 'id': edu.id}), 201
 
 @profile_bp.route('/profiles/me/education/<int:edu_id>', methods=['DELETE'])
@@ -239,6 +253,7 @@ def delete_education(edu_id):
     db.session.flush()
     profile.calculate_completeness()
     db.session.commit()
+    _profile_changed(profile)
     return jsonify({'message': 'Education deleted'})
 
 
@@ -1,4 +1,7 @@
 from flask import Blueprint, jsonify, send_from_directory, current_app
+from ..services.warmup import readiness
+from ..services.llm_cache import llm_cache
+from ..services.llm_service import llm_service
 import os
 
 utility_bp = Blueprint('utility_bp', __name__)
@@ -9,10 +12,15 @@ def health_check():
 
 @utility_bp.route('/system/status', methods=['GET'])
 def get_system_status():
-    """Returns the current server instance ID."""
+    """Returns the current server instance ID and whether the AI components are loaded."""
+    overall, components = readiness()
     return jsonify({
         'status': 'online',
-        'instance_id': current_app.config.get('SERVER_INSTANCE_ID')
+        'instance_id': current_app.config.get('SERVER_INSTANCE_ID'),
+        'readiness': overall,
+        'components': components,
+        'llm_cache': llm_cache.stats(),
+        'llm_routing': llm_service.router.stats()
     })
 
 @utility_bp.route('/uploads/<path:filename>', methods=['GET'])
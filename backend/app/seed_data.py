@@ -1,6 +1,7 @@
 from .database import db
 from .models import User, Profile, Job, Application, Employee, Performance, Education, Experience, Interview
 from .services.matching_service import matching_service
+from .services.job_search import job_search
 from datetime import datetime, timedelta
 import random
 import csv
@@ -13,6 +14,7 @@ def seed_database():
     print("--- Clearing existing data ---")
     db.drop_all()
     db.create_all()
+    job_search.ensure_index()
     print("--- Database cleared ---")
 
     print("--- Seeding with Rich Contextual Data ---")
@@ -0,0 +1,202 @@
+import threading
+import numpy as np
+
+
+class IVFIndex:
+    """
+    Inverted-file (IVF) approximate nearest-neighbour index over unit vectors.
+    Vectors are clustered around spherical k-means centroids and a query only
+    scans the lists of its `nprobe` closest centroids. Until the index holds
+    `min_train_size` vectors it is untrained and every search is exact.
+    Supports incremental add/remove; centroids are retrained once the index
+    has grown by `retrain_factor` since the last training. Replaced and removed
+    vectors leave dead rows that are compacted away once they pass `max_dead_fraction`.
+    """
+    def __init__(self, nprobe=32, min_train_size=2048, retrain_factor=2.0, kmeans_iterations=10, seed=0,
+                 max_dead_fraction=0.5):
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.retrain_factor = retrain_factor
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+        self.max_dead_fraction = max_dead_fraction
+
+        self._lock = threading.RLock()
+        self._vectors = None # (capacity, dim) float32
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._lists = np.zeros(0, dtype=np.int32) # centroid of each row
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0 # rows in use (alive or deleted)
+        self._row_of = {}
+        self._centroids = None
+        self._trained_size = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._row_of)
+
+    def __contains__(self, item_id):
+        with self._lock:
+            return item_id in self._row_of
+
+    @property
+    def is_trained(self):
+        return self._centroids is not None
+
+    # --- Updates ---
+
+    def add(self, item_id, vector):
+        self.add_many([item_id], [vector])
+
+    def add_many(self, item_ids, vectors):
+        """
+        Inserts (or replaces) vectors in bulk; training is checked once at the end.
+        """
+        latest = dict(zip(item_ids, vectors)) # Last vector wins for repeated ids
+        if not latest:
+            return
+        item_ids = list(latest.keys())
+        vectors = np.asarray(list(latest.values()), dtype=np.float32)
+
+        with self._lock:
+            for item_id in item_ids:
+                row = self._row_of.pop(item_id, None)
+                if row is not None:
+                    self._alive[row] = False
+            self._compact_if_needed() # before appending, so the new rows land after the live ones
+
+            start, end = self._size, self._size + len(item_ids)
+            self._reserve(end, vectors.shape[1])
+            self._vectors[start:end] = vectors
+            self._ids[start:end] = item_ids
+            self._lists[start:end] = self._assign(vectors) if self.is_trained else 0
+            self._alive[start:end] = True
+            for offset, item_id in enumerate(item_ids):
+                self._row_of[item_id] = start + offset
+            self._size = end
+
+            live = len(self._row_of)
+            if not self.is_trained and live >= self.min_train_size:
+                self.train()
+            elif self.is_trained and live >= self._trained_size * self.retrain_factor:
+                self.train()
+
+    def remove(self, item_id):
+        with self._lock:
+            row = self._row_of.pop(item_id, None)
+            if row is not None:
+                self._delete_row(row)
+
+    def clear(self):
+        with self._lock:
+            self._vectors = None
+            self._ids = np.zeros(0, dtype=np.int64)
+            self._lists = np.zeros(0, dtype=np.int32)
+            self._alive = np.zeros(0, dtype=bool)
+            self._size = 0
+            self._row_of = {}
+            self._centroids = None
+            self._trained_size = 0
+
+    def _delete_row(self, row):
+        self._alive[row] = False
+        self._compact_if_needed()
+
+    def _compact_if_needed(self):
+        dead = self._size - len(self._row_of)
+        if self._size > 64 and dead > self._size * self.max_dead_fraction:
+            self._compact()
+
+    def _reserve(self, rows, dim):
+        if self._vectors is None:
+            capacity = max(rows, 64)
+            self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+            self._ids = np.zeros(capacity, dtype=np.int64)
+            self._lists = np.zeros(capacity, dtype=np.int32)
+            self._alive = np.zeros(capacity, dtype=bool)
+            return
+        if rows <= self._vectors.shape[0]:
+            return
+        capacity = max(rows, self._vectors.shape[0] * 2)
+        extra = capacity - self._vectors.shape[0]
+        self._vectors = np.vstack([self._vectors, np.zeros((extra, self._vectors.shape[1]), dtype=np.float32)])
+        self._ids = np.concatenate([self._ids, np.zeros(extra, dtype=np.int64)])
+        self._lists = np.concatenate([self._lists, np.zeros(extra, dtype=np.int32)])
+        self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+
+    def _compact(self):
+        rows = np.flatnonzero(self._alive[:self._size])
+        count = len(rows)
+        self._vectors[:count] = self._vectors[rows]
+        self._ids[:count] = self._ids[rows]
+        self._lists[:count] = self._lists[rows]
+        self._alive[:count] = True
+        self._alive[count:] = False
+        self._size = count
+        self._row_of = {int(item_id): row for row, item_id in enumerate(self._ids[:count])}
+
+    # --- Training ---
+
+    def train(self):
+        """
+        Fits the coarse quantizer (spherical k-means) and reassigns every vector.
+        """
+        with self._lock:
+            rows = np.flatnonzero(self._alive[:self._size])
+            if len(rows) == 0:
+                self._centroids = None
+                return
+            data = self._vectors[rows]
+            nlist = max(1, int(np.sqrt(len(rows))))
+
+            rng = np.random.default_rng(self.seed)
+            sample = data if len(data) <= nlist * 64 else data[rng.choice(len(data), nlist * 64, replace=False)]
+            centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+            for _ in range(self.kmeans_iterations):
+                assign = np.argmax(sample @ centroids.T, axis=1)
+                for c in range(nlist):
+                    members = sample[assign == c]
+                    if len(members):
+                        centroids[c] = members.sum(axis=0)
+                norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+                centroids = centroids / np.where(norms == 0, 1.0, norms)
+
+            self._centroids = centroids.astype(np.float32)
+            self._lists[rows] = self._assign(data)
+            self._trained_size = len(rows)
+
+    def _assign(self, vectors):
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    # --- Search ---
+
+    def search(self, query, k, nprobe=None, exact=False):
+        """
+        Returns up to k (item_id, similarity) pairs, most similar first.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            if not self._row_of or k <= 0:
+                return []
+
+            alive = self._alive[:self._size]
+            if exact or not self.is_trained:
+                # Brute force over every live vector
+                rows = np.flatnonzero(alive)
+                sims = (self._vectors[:self._size] @ query)[rows]
+            else:
+                nprobe = min(nprobe or self.nprobe, len(self._centroids))
+                centroid_sims = self._centroids @ query
+                probe = np.argpartition(-centroid_sims, nprobe - 1)[:nprobe]
+                rows = np.flatnonzero(alive & np.isin(self._lists[:self._size], probe))
+                sims = self._vectors[rows] @ query
+
+            if len(rows) == 0:
+                return []
+            if len(rows) > k:
+                top = np.argpartition(-sims, k - 1)[:k]
+            else:
+                top = np.arange(len(rows))
+            top = top[np.argsort(-sims[top], kind='stable')]
+            return [(int(self._ids[rows[i]]), float(sims[i])) for i in top]
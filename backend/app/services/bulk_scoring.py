@@ -0,0 +1,273 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from ..database import db
+from ..models import Application, Job, MatchScore, Profile, User
+from .matching_service import matching_service
+
+
+# --- Worker side (runs in the pool processes) ---
+
+def _init_worker():
+    # The spaCy model loads lazily; load it once per worker process here
+    # so the first task doesn't pay for it
+    return matching_service.nlp
+
+
+def _score_group(profile, jobs):
+    """
+    Scores one profile payload against a list of job payloads.
+    Jobs keep their ids, so each worker parses a posting once and reuses it.
+    """
+    return matching_service.score_many(profile, [SimpleNamespace(**job) for job in jobs])
+
+
+# --- Payloads (plain data, cheap to send to workers) ---
+
+def profile_payload(profile):
+    """
+    Serializes a Profile into the parsed-resume dict shape; the matching service
+    builds the same profile text from it as from the model.
+    """
+    payload = {
+        'experience': [
+            {'title': exp.title, 'company': exp.company, 'description': exp.description}
+            for exp in profile.experiences
+        ],
+        'education': [
+            {'degree': edu.degree, 'institution': edu.institution}
+            for edu in profile.educations
+        ],
+    }
+    skills = getattr(profile, 'skills', None)
+    if skills:
+        payload['skills'] = list(skills)
+    if profile.summary:
+        payload['summary'] = profile.summary
+    return payload
+
+
+def job_payload(job):
+    return {'id': job.id, 'title': job.title, 'tags': job.tags, 'description': job.description}
+
+
+class BulkScorer:
+    """
+    Rescores stored scores in bulk on a process pool.
+    - applications: recomputes Application.match_score for every application, from the
+      candidate's uploaded resume like the apply route (parses are LLM-cached), else the profile
+    - match-scores: stores missing `match_scores` rows (new catalogue or algorithm version)
+    Work is streamed from the database in chunks, results are written back in one
+    batch per chunk, and the last finished chunk is checkpointed so an interrupted
+    run resumes where it stopped.
+    """
+    TARGETS = ('applications', 'match-scores')
+
+    def __init__(self, app, workers=None, chunk_size=2000, group_size=500,
+                 checkpoint_path='.rescore_checkpoint.json'):
+        self.app = app
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.group_size = group_size
+        self.checkpoint_path = checkpoint_path
+
+    def run(self, target, resume=True):
+        if target not in self.TARGETS:
+            raise ValueError(f"Unknown target '{target}', expected one of {', '.join(self.TARGETS)}")
+        if not resume:
+            self._save_checkpoint(target, None)
+
+        with self.app.app_context():
+            if target == 'applications':
+                return self._run(target, *self._application_chunks())
+            return self._run(target, *self._match_score_chunks())
+
+    # --- Driver ---
+
+    def _run(self, target, total, chunks, write):
+        """
+        Scores chunks of (checkpoint_id, [(key, profile, jobs)]) and writes each one back.
+        """
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) if self.workers > 1 else None
+        done = 0
+        started = time.perf_counter()
+        try:
+            for checkpoint_id, groups in chunks:
+                if pool:
+                    futures = [pool.submit(_score_group, profile, jobs) for _, profile, jobs in groups]
+                    results = [future.result() for future in futures]
+                else:
+                    results = [_score_group(profile, jobs) for _, profile, jobs in groups]
+
+                write([(key, scores) for (key, _, _), scores in zip(groups, results)])
+                self._save_checkpoint(target, checkpoint_id)
+
+                if not results:
+                    continue
+                done += sum(len(scores) for scores in results)
+                elapsed = time.perf_counter() - started
+                percent = 100.0 * done / total if total else 100.0
+                print(f"[{target}] {done}/{total} pairs ({percent:.1f}%), {done / max(elapsed, 1e-9):.0f} pairs/s")
+        finally:
+            if pool:
+                pool.shutdown()
+
+        self._save_checkpoint(target, None)
+        print(f"[{target}] done: {done} pairs in {time.perf_counter() - started:.1f}s")
+        return done
+
+    # --- Applications ---
+
+    def _application_chunks(self):
+        last_id = self._load_checkpoint('applications')
+        base = Application.query.filter(Application.id > last_id)
+        total = base.count()
+
+        def chunks():
+            cursor = last_id
+            while True:
+                apps = (Application.query
+                        .filter(Application.id > cursor)
+                        .order_by(Application.id)
+                        .limit(self.chunk_size)
+                        .all())
+                if not apps:
+                    return
+                cursor = apps[-1].id
+
+                profiles = self._load_profiles({a.user_id for a in apps}, prefer_resume=True)
+                jobs = {job.id: job_payload(job) for job in Job.query.filter(Job.id.in_({a.job_id for a in apps}))}
+
+                by_user = {}
+                for a in apps:
+                    if a.user_id in profiles and a.job_id in jobs:
+                        by_user.setdefault(a.user_id, []).append(a)
+                groups = [([a.id for a in user_apps], profiles[user_id], [jobs[a.job_id] for a in user_apps])
+                          for user_id, user_apps in by_user.items()]
+                db.session.expunge_all()
+                yield cursor, groups
+
+        def write(results):
+            mappings = [{'id': app_id, 'match_score': score}
+                        for app_ids, scores in results for app_id, score in zip(app_ids, scores)]
+            db.session.bulk_update_mappings(Application, mappings)
+            db.session.commit()
+
+        return total, chunks(), write
+
+    # --- Match scores ---
+
+    def _match_score_chunks(self):
+        last_id = self._load_checkpoint('match-scores')
+        version = matching_service.algorithm_version
+        users = (db.session.query(User.id)
+                 .join(Profile, Profile.user_id == User.id)
+                 .filter(User.role == 'candidate', User.id > last_id))
+        stored = (MatchScore.query
+                  .filter(MatchScore.algorithm_version == version,
+                          MatchScore.user_id.in_(db.select(users.subquery().c.id)))
+                  .count())
+        total = users.count() * Job.query.count() - stored
+
+        def chunks():
+            cursor = last_id
+            users_per_chunk = max(1, self.chunk_size // max(Job.query.count(), 1))
+            while True:
+                user_ids = [user_id for (user_id,) in users.filter(User.id > cursor)
+                            .order_by(User.id).limit(users_per_chunk)]
+                if not user_ids:
+                    return
+                cursor = user_ids[-1]
+
+                profiles = self._load_profiles(user_ids)
+                groups = []
+                for user_id in user_ids:
+                    missing = (db.session.query(Job.id, Job.title, Job.tags, Job.description)
+                               .outerjoin(MatchScore, and_(MatchScore.job_id == Job.id,
+                                                           MatchScore.user_id == user_id,
+                                                           MatchScore.algorithm_version == version))
+                               .filter(MatchScore.job_id.is_(None))
+                               .order_by(Job.id)
+                               .all())
+                    jobs = [row._asdict() for row in missing]
+                    for start in range(0, len(jobs), self.group_size):
+                        part = jobs[start:start + self.group_size]
+                        groups.append(((user_id, [job['id'] for job in part]), profiles[user_id], part))
+                db.session.expunge_all()
+                yield cursor, groups
+
+        def write(results):
+            rows = [{'user_id': user_id, 'job_id': job_id, 'algorithm_version': version, 'score': score}
+                    for (user_id, job_ids), scores in results for job_id, score in zip(job_ids, scores)]
+            try:
+                db.session.bulk_insert_mappings(MatchScore, rows)
+                db.session.commit()
+            except IntegrityError:
+                # The web app stored some of these meanwhile; fall back to upserting row by row
+                db.session.rollback()
+                for row in rows:
+                    db.session.merge(MatchScore(**row))
+                db.session.commit()
+
+        return total, chunks(), write
+
+    # --- Helpers ---
+
+    def _load_profiles(self, user_ids, prefer_resume=False):
+        """
+        Returns {user_id: payload}. With `prefer_resume`, candidates with an uploaded resume
+        get its parsed data (as when they applied), the rest their profile.
+        """
+        profiles = (Profile.query
+                    .options(selectinload(Profile.experiences), selectinload(Profile.educations))
+                    .filter(Profile.user_id.in_(user_ids))
+                    .all())
+        upload_folder = os.path.join(self.app.root_path, 'uploads')
+        payloads = {}
+        for profile in profiles:
+            resume_data = None
+            if prefer_resume:
+                try:
+                    resume_data = matching_service.parse_stored_resume(profile, upload_folder)
+                except Exception as e:
+                    print(f"Error parsing resume of user {profile.user_id}: {e}")
+            payloads[profile.user_id] = resume_data or profile_payload(profile)
+        return payloads
+
+    def _load_checkpoint(self, target):
+        try:
+            with open(self.checkpoint_path) as f:
+                entry = json.load(f).get(target)
+        except (OSError, ValueError):
+            return 0
+        # A checkpoint from another scoring version doesn't apply
+        if not entry or entry.get('algorithm_version') != matching_service.algorithm_version:
+            return 0
+        print(f"[{target}] resuming after id {entry['last_id']}")
+        return entry['last_id']
+
+    def _save_checkpoint(self, target, last_id):
+        try:
+            with open(self.checkpoint_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+
+        if last_id is None:
+            state.pop(target, None)
+        else:
+            state[target] = {'last_id': last_id, 'algorithm_version': matching_service.algorithm_version}
+
+        if not state:
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+            return
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
@@ -0,0 +1,8 @@
+from ..config import Config
+from .ttl_cache import TTLCache
+
+# Legacy X-User-Id value (first name + phone suffix) -> user id
+legacy_identity_cache = TTLCache(max_size=Config.LEGACY_IDENTITY_CACHE_SIZE, ttl=Config.LEGACY_IDENTITY_CACHE_TTL)
+
+# Bearer token -> verified JWT claims
+token_cache = TTLCache(max_size=Config.TOKEN_CACHE_SIZE, ttl=Config.TOKEN_CACHE_TTL)
@@ -0,0 +1,92 @@
+import hashlib
+import threading
+from collections import Counter, namedtuple
+from itertools import chain
+
+# Scoring features derived from a single job posting.
+# - signature: hash of the job text the features were built from
+# - vector: L2-normalized document vector (zero vector if the doc has no vector)
+# - lemmas: set of core lemmas from title + tags
+JobFeatures = namedtuple('JobFeatures', ['signature', 'vector', 'lemmas'])
+
+
+class JobFeatureIndex:
+    """
+    In-memory store of per-job scoring features, keyed by job id.
+    Each entry remembers the signature of the text it was built from, so an
+    entry that no longer matches the job (edited elsewhere) is treated as missing.
+    Also keeps an inverted index from core lemma to the ids of jobs containing it.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._postings = {}
+        self._core_sizes = {} # job_id -> number of core lemmas, kept up to date on put/remove
+
+    @staticmethod
+    def signature(job):
+        raw = "\x1f".join([job.title or '', job.tags or '', job.description or ''])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, job):
+        """
+        Returns the cached features for a job, or None if missing or stale.
+        """
+        with self._lock:
+            entry = self._entries.get(job.id)
+        if entry is None or entry.signature != self.signature(job):
+            return None
+        return entry
+
+    def put(self, job_id, features):
+        with self._lock:
+            self._unlink(job_id)
+            self._entries[job_id] = features
+            self._core_sizes[job_id] = len(features.lemmas)
+            for lemma in features.lemmas:
+                self._postings.setdefault(lemma, set()).add(job_id)
+
+    def remove(self, job_id):
+        with self._lock:
+            self._unlink(job_id)
+
+    def _unlink(self, job_id):
+        entry = self._entries.pop(job_id, None)
+        if entry is None:
+            return
+        del self._core_sizes[job_id]
+        for lemma in entry.lemmas:
+            job_ids = self._postings.get(lemma)
+            if job_ids is not None:
+                job_ids.discard(job_id)
+                if not job_ids:
+                    del self._postings[lemma]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+            self._core_sizes.clear()
+
+    def overlap_counts(self, lemmas):
+        """
+        Returns {job_id: number of the job's core lemmas found in `lemmas`} for every
+        indexed job sharing at least one lemma, in one pass over the given terms.
+        """
+        with self._lock:
+            return Counter(chain.from_iterable(
+                self._postings[lemma] for lemma in lemmas if lemma in self._postings
+            ))
+
+    def core_sizes(self, job_ids=None):
+        """
+        Returns {job_id: number of core lemmas} for the given (indexed) jobs, or for every indexed job.
+        """
+        with self._lock:
+            if job_ids is None:
+                return dict(self._core_sizes)
+            return {job_id: self._core_sizes[job_id] for job_id in job_ids if job_id in self._core_sizes}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,223 @@
+import re
+from sqlalchemy import text, or_, and_
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from ..database import db
+from ..models import Job
+
+# Columns covered by the full-text index, with their BM25 weights (title matters most)
+SEARCH_COLUMNS = ['title', 'description', 'tags', 'company', 'location']
+BM25_WEIGHTS = [10.0, 1.0, 5.0, 2.0, 2.0]
+# Stripped from the ends of query words before checking them for symbols ("python," is a plain word)
+QUERY_PUNCTUATION = ',;:!?"\'()[]'
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, description, tags, company, location,
+        content='jobs', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, description, tags, company, location)
+        VALUES (new.id, new.title, new.description, new.tags, new.company, new.location);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description, tags, company, location)
+        VALUES ('delete', old.id, old.title, old.description, old.tags, old.company, old.location);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description, tags, company, location)
+        VALUES ('delete', old.id, old.title, old.description, old.tags, old.company, old.location);
+        INSERT INTO jobs_fts(rowid, title, description, tags, company, location)
+        VALUES (new.id, new.title, new.description, new.tags, new.company, new.location);
+    END""",
+]
+SQLITE_TRIGGERS = ('jobs_fts_ai', 'jobs_fts_ad', 'jobs_fts_au')
+
+POSTGRES_DDL = [
+    """ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(tags, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(company, '') || ' ' || coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_search_vector ON jobs USING GIN (search_vector)",
+]
+
+
+class JobSearch:
+    """
+    Full-text search over job postings.
+    - SQLite: an FTS5 table mirroring `jobs`, kept in sync by triggers, ranked with BM25
+    - Postgres: a generated, weighted tsvector column with a GIN index, ranked with ts_rank_cd
+    - anything else (or SQLite built without FTS5): AND of LIKE filters, unranked
+    Every query term matches as a prefix ("pyth" finds "python"). Queries whose words carry
+    symbols the tokenizers drop ("c#", "c++", ".net") are matched literally with LIKE instead.
+    """
+    def __init__(self):
+        self.backend = 'like'
+
+    def init_app(self, app):
+        with app.app_context():
+            self.ensure_index()
+
+    def ensure_index(self):
+        """
+        Creates the index structures if missing (idempotent). Call again after drop_all/create_all.
+        """
+        dialect = db.engine.dialect.name
+        try:
+            if dialect == 'sqlite':
+                self._ensure_sqlite()
+                self.backend = 'fts5'
+            elif dialect == 'postgresql':
+                with db.engine.begin() as conn:
+                    for statement in POSTGRES_DDL:
+                        conn.execute(text(statement))
+                self.backend = 'postgres'
+            else:
+                self.backend = 'like'
+        except (OperationalError, ProgrammingError) as e:
+            print(f"Full-text search unavailable, falling back to LIKE: {e}")
+            self.backend = 'like'
+
+    def _ensure_sqlite(self):
+        with db.engine.begin() as conn:
+            names = {row[0] for row in conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'jobs'"
+            ))}
+            for statement in SQLITE_DDL:
+                conn.execute(text(statement))
+            # Missing triggers mean a new index or a recreated jobs table: reindex from scratch
+            if not set(SQLITE_TRIGGERS) <= names:
+                conn.execute(text("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')"))
+
+    @staticmethod
+    def _terms(q):
+        return re.findall(r'\w+', (q or '').lower())[:16]
+
+    @staticmethod
+    def _literal_terms(q):
+        """
+        The words of `q` as literal substrings when tokenizing would lose part of them:
+        a word with a symbol in it ("c#" would become the prefix "c*") or no word characters at all.
+        Returns None when the tokenized terms can be used.
+        """
+        words = [word.strip(QUERY_PUNCTUATION) for word in (q or '').lower().split()]
+        words = [word for word in words if word]
+        if any(re.search(r'\W', word) for word in words):
+            return words[:16]
+        return None
+
+    def search(self, q, location=None, limit=100):
+        """
+        Returns up to `limit` (job_id, snippet) pairs matching every term of `q`, best match first.
+        Snippets highlight the matched terms in the description with <mark> tags (None without FTS).
+        Queries with symbols (e.g. "c#", "++") are matched as plain substrings instead.
+        """
+        literal = self._literal_terms(q)
+        if literal:
+            return self._search_like(literal, location, limit)
+        terms = self._terms(q)
+        if not terms:
+            return []
+        if self.backend == 'fts5':
+            return self._search_sqlite(terms, location, limit)
+        if self.backend == 'postgres':
+            return self._search_postgres(terms, location, limit)
+        return self._search_like(terms, location, limit)
+
+    def count(self, q, location=None):
+        """
+        Number of jobs `search` would match without a limit.
+        """
+        literal = self._literal_terms(q)
+        if literal:
+            return self._like_query(literal, location).count()
+        terms = self._terms(q)
+        if not terms:
+            return 0
+        if self.backend == 'fts5':
+            sql = """
+                SELECT count(*) FROM jobs_fts
+                JOIN jobs ON jobs.id = jobs_fts.rowid
+                WHERE jobs_fts MATCH :match
+                  AND (:location IS NULL OR lower(jobs.location) LIKE :location ESCAPE '\\')
+            """
+            params = {'match': self._fts_match(terms), 'location': self._like(location)}
+        elif self.backend == 'postgres':
+            sql = """
+                SELECT count(*) FROM jobs, to_tsquery('english', :query) AS query
+                WHERE search_vector @@ query
+                  AND (CAST(:location AS text) IS NULL OR lower(location) LIKE :location ESCAPE '\\')
+            """
+            params = {'query': self._ts_query(terms), 'location': self._like(location)}
+        else:
+            return self._like_query(terms, location).count()
+        return db.session.execute(text(sql), params).scalar()
+
+    def _search_sqlite(self, terms, location, limit):
+        match = self._fts_match(terms)
+        weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+        sql = f"""
+            SELECT jobs_fts.rowid,
+                   snippet(jobs_fts, 1, '<mark>', '</mark>', '…', 16)
+            FROM jobs_fts
+            JOIN jobs ON jobs.id = jobs_fts.rowid
+            WHERE jobs_fts MATCH :match
+              AND (:location IS NULL OR lower(jobs.location) LIKE :location ESCAPE '\\')
+            ORDER BY bm25(jobs_fts, {weights}), jobs_fts.rowid
+            LIMIT :limit
+        """
+        rows = db.session.execute(text(sql), {
+            'match': match, 'location': self._like(location), 'limit': limit
+        })
+        return [(row[0], row[1]) for row in rows]
+
+    def _search_postgres(self, terms, location, limit):
+        sql = """
+            SELECT id,
+                   ts_headline('english', coalesce(description, ''), query,
+                               'StartSel=<mark>, StopSel=</mark>, MaxWords=24, MinWords=8')
+            FROM jobs, to_tsquery('english', :query) AS query
+            WHERE search_vector @@ query
+              AND (CAST(:location AS text) IS NULL OR lower(location) LIKE :location ESCAPE '\\')
+            ORDER BY ts_rank_cd(search_vector, query) DESC, id
+            LIMIT :limit
+        """
+        rows = db.session.execute(text(sql), {
+            'query': self._ts_query(terms),
+            'location': self._like(location),
+            'limit': limit
+        })
+        return [(row[0], row[1]) for row in rows]
+
+    def _search_like(self, terms, location, limit):
+        query = self._like_query(terms, location)
+        return [(job_id, None) for (job_id,) in query.order_by(Job.id).limit(limit)]
+
+    def _like_query(self, terms, location):
+        columns = [getattr(Job, name) for name in SEARCH_COLUMNS]
+        query = Job.query.with_entities(Job.id).filter(and_(*[
+            or_(*[column.ilike(f'%{self._escape_like(term)}%', escape='\\') for column in columns]) for term in terms
+        ]))
+        if location:
+            query = query.filter(Job.location.ilike(f'%{self._escape_like(location)}%', escape='\\'))
+        return query
+
+    @staticmethod
+    def _escape_like(term):
+        # Terms are matched literally: %, _ and \ in them are not wildcards
+        return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+    @staticmethod
+    def _fts_match(terms):
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    @staticmethod
+    def _ts_query(terms):
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    @classmethod
+    def _like(cls, location):
+        return f'%{cls._escape_like(location.lower())}%' if location else None
+
+job_search = JobSearch()
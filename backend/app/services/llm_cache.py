@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from ..config import Config
+from .ttl_cache import TTLCache
+
+
+def _normalize(prompt):
+    # Prompts are indented triple-quoted strings; whitespace differences don't change the answer
+    return ' '.join((prompt or '').split())
+
+def _strip_fences(text):
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.replace('```json', '').replace('```', '')
+    return text
+
+
+class LLMCache:
+    """
+    Two-tier cache of LLM responses keyed by (provider, model, system prompt, user prompt).
+    - memory: LRU with per-entry expiry, per process
+    - disk: SQLite file shared by every worker process, survives restarts
+    Each caller names an endpoint whose TTL comes from Config.LLM_CACHE_TTLS.
+    """
+    def __init__(self, path, memory_size=512, enabled=True, ttls=None):
+        self.path = path
+        self.enabled = enabled
+        self.ttls = ttls or {}
+        self.memory = TTLCache(max_size=memory_size, ttl=max(self.ttls.values(), default=3600))
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self.counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'rejected': 0, 'errors': 0}
+
+    @staticmethod
+    def key(provider, model, system_prompt, user_prompt):
+        payload = json.dumps([provider, model, _normalize(system_prompt), _normalize(user_prompt)])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def ttl(self, endpoint):
+        return self.ttls.get(endpoint, 0) if self.enabled and endpoint else 0
+
+    def get(self, keys):
+        """
+        Returns the first cached response among `keys` (one per configured provider), or None.
+        """
+        for key in keys:
+            value = self.memory.get(key)
+            if value is not None:
+                self._count('memory_hits')
+                return value
+
+        now = time.time()
+        for key in keys:
+            row = self._execute('SELECT response, expires_at FROM llm_responses WHERE key = ? AND expires_at > ?',
+                                (key, now), fetch=True)
+            if row:
+                response, expires_at = row
+                self.memory.put(key, response, ttl=expires_at - now)
+                self._count('disk_hits')
+                return response
+
+        self._count('misses')
+        return None
+
+    def put(self, key, response, endpoint, expects_json=False):
+        ttl = self.ttl(endpoint)
+        if ttl <= 0 or not response or not response.strip():
+            return
+        if expects_json:
+            # Don't pin a malformed answer for days; the next call gets a fresh attempt
+            try:
+                json.loads(_strip_fences(response))
+            except ValueError:
+                self._count('rejected')
+                return
+        self.memory.put(key, response, ttl=ttl)
+        self._execute('INSERT OR REPLACE INTO llm_responses (key, response, expires_at) VALUES (?, ?, ?)',
+                      (key, response, time.time() + ttl))
+        self._count('stores')
+
+    def clear(self):
+        self.memory.clear()
+        self._execute('DELETE FROM llm_responses')
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters['memory_hits'] + counters['disk_hits'] + counters['misses']
+        hits = counters['memory_hits'] + counters['disk_hits']
+        counters['hit_rate'] = round(hits / lookups, 3) if lookups else None
+        counters['enabled'] = self.enabled
+        return counters
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _connection(self):
+        # One connection per process: a connection inherited through fork must not be reused
+        if self._conn is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS llm_responses ('
+                         'key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL)')
+            conn.execute('DELETE FROM llm_responses WHERE expires_at <= ?', (time.time(),))
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    def _execute(self, sql, params, fetch=False):
+        try:
+            with self._lock:
+                cursor = self._connection().execute(sql, params)
+                return cursor.fetchone() if fetch else None
+        except sqlite3.Error as e:
+            # The disk tier is best effort; the memory tier and the provider still work
+            print(f"LLM cache error: {e}")
+            self._count('errors')
+            return None
+
+
+llm_cache = LLMCache(
+    Config.LLM_CACHE_PATH,
+    memory_size=Config.LLM_CACHE_MEMORY_SIZE,
+    enabled=Config.LLM_CACHE_ENABLED,
+    ttls=Config.LLM_CACHE_TTLS
+)
@@ -0,0 +1,310 @@
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import numpy as np
+
+# One LLM backend: `call(system_prompt, user_prompt, timeout)` returns the reply text
+Provider = namedtuple('Provider', ['name', 'model', 'call', 'deadline'])
+
+
+class LatencyTracker:
+    """
+    Per-provider latency: an EWMA (orders providers) and a window of recent samples (p95).
+    A failure counts as a sample at least as long as the provider's deadline, so failing
+    providers sink in the order the same way slow ones do. An average older than
+    `reset_after` seconds is forgotten, so a demoted provider gets tried again.
+    """
+    def __init__(self, alpha=0.2, window=200, reset_after=60):
+        self.alpha = alpha
+        self.window = window
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+        self._ewma = {}
+        self._updated = {}
+        self._samples = {}
+        self._counts = {}
+
+    def record(self, name, seconds, ok=True):
+        with self._lock:
+            previous = self._ewma.get(name)
+            if previous is None or time.monotonic() - self._updated[name] > self.reset_after:
+                self._ewma[name] = seconds
+            else:
+                self._ewma[name] = self.alpha * seconds + (1 - self.alpha) * previous
+            self._updated[name] = time.monotonic()
+            self._samples.setdefault(name, deque(maxlen=self.window)).append(seconds)
+            counts = self._counts.setdefault(name, {'calls': 0, 'failures': 0})
+            counts['calls'] += 1
+            counts['failures'] += 0 if ok else 1
+
+    def ewma(self, name):
+        """
+        Smoothed latency in seconds, or None if unknown or stale.
+        """
+        with self._lock:
+            if name not in self._ewma or time.monotonic() - self._updated[name] > self.reset_after:
+                return None
+            return self._ewma[name]
+
+    def p95(self, name, min_samples=20):
+        with self._lock:
+            samples = list(self._samples.get(name, ()))
+        if len(samples) < min_samples:
+            return None
+        return float(np.percentile(samples, 95))
+
+    def stats(self):
+        with self._lock:
+            names = list(self._counts)
+            snapshot = {name: dict(self._counts[name], ewma_ms=round(self._ewma[name] * 1000)) for name in names}
+        for name in names:
+            counts = snapshot[name]
+            counts['success_rate'] = round(1 - counts['failures'] / counts['calls'], 3)
+        for name in names:
+            p95 = self.p95(name)
+            snapshot[name]['p95_ms'] = round(p95 * 1000) if p95 is not None else None
+        return snapshot
+
+
+def _is_quota_error(error):
+    # Quota exhausted / rate limited: retrying before the cool-down only adds latency
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+    return status == 429 or type(error).__name__ in ('ResourceExhausted', 'RateLimitError')
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+    - closed: calls go through; opens when the failure rate over the last `window` calls
+      reaches `failure_rate` (after at least `min_calls`), or at once on a quota error
+    - open: the provider is skipped until `cooldown` seconds have passed
+    - half_open: a single probe call goes through; success closes the breaker, failure reopens it
+    """
+    def __init__(self, failure_rate=0.5, min_calls=5, window=20, cooldown=30):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._state = 'closed'
+        self._opened_at = None
+        self._probing = False
+        self.trips = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == 'open' and time.monotonic() - self._opened_at >= self.cooldown:
+            self._state = 'half_open'
+            self._probing = False
+        return self._state
+
+    def acquire(self):
+        """
+        True if a call may go out now (in half-open state, only the one probe).
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, ok, error=None):
+        with self._lock:
+            state = self._current_state()
+            if state == 'half_open':
+                if ok:
+                    self._state = 'closed'
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                self._probing = False
+                return
+            self._outcomes.append(ok)
+            if state != 'closed' or ok:
+                return
+            failures = self._outcomes.count(False)
+            if _is_quota_error(error) or (len(self._outcomes) >= self.min_calls
+                                          and failures / len(self._outcomes) >= self.failure_rate):
+                self._open()
+
+    def _open(self):
+        self._state = 'open'
+        self._opened_at = time.monotonic()
+        self.trips += 1
+
+    def stats(self):
+        with self._lock:
+            state = self._current_state()
+            retry_in = self.cooldown - (time.monotonic() - self._opened_at) if state == 'open' else None
+            return {'state': state, 'trips': self.trips,
+                    'retry_in_s': round(retry_in, 1) if retry_in is not None else None}
+
+
+class LLMRouter:
+    """
+    Routes a prompt across providers:
+    - order: fastest EWMA latency first; a provider without a (recent) average is tried first,
+      once, to measure it (configured order breaks ties, so Gemini leads on a cold start)
+    - deadlines: a provider that hasn't answered within its deadline is abandoned
+    - hedging: if the running call is slower than the hedge delay (its provider's p95, or a
+      fixed value), the next provider starts in parallel and the first answer wins
+    - failures start the next provider immediately
+    - breakers: a provider whose circuit breaker is open is skipped without being called
+    """
+    DEFAULT_HEDGE_AFTER = 4.0
+
+    def __init__(self, tracker=None, hedging=True, hedge_after=None, max_workers=16, breaker_options=None):
+        self.tracker = tracker or LatencyTracker()
+        self.breaker_options = breaker_options or {}
+        self._breakers = {}
+        self.hedging = hedging
+        self.hedge_after = hedge_after
+        self.max_workers = max_workers
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.counters = {'requests': 0, 'hedges': 0, 'hedge_wins': 0, 'fallbacks': 0, 'timeouts': 0, 'skipped': 0}
+
+    def breaker(self, name):
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(**self.breaker_options)
+            return self._breakers[name]
+
+    def order(self, providers):
+        rank = {p.name: i for i, p in enumerate(providers)}
+        def key(p):
+            ewma = self.tracker.ewma(p.name)
+            return (ewma or 0.0, rank[p.name])
+        return sorted(providers, key=key)
+
+    def hedge_delay(self, provider):
+        if self.hedge_after is not None:
+            return self.hedge_after
+        p95 = self.tracker.p95(provider.name)
+        return p95 if p95 is not None else self.DEFAULT_HEDGE_AFTER
+
+    def generate(self, providers, system_prompt, user_prompt):
+        """
+        Returns (text, provider) from the first provider that answers in time.
+        """
+        if not providers:
+            raise Exception("No LLM provider configured or available.")
+        self._count('requests')
+
+        order = self.order(providers)
+        pool = self._executor()
+        pending = {}
+        last_error = None
+        next_index = 0
+        hedge_at = float('inf')
+
+        def start_next(reason=None):
+            """
+            Starts the next provider whose breaker lets a call through; False if none is left.
+            """
+            nonlocal next_index, hedge_at
+            while next_index < len(order):
+                provider = order[next_index]
+                next_index += 1
+                if not self.breaker(provider.name).acquire():
+                    self._count('skipped')
+                    continue
+                if reason:
+                    self._count(reason)
+                    print(f"LLM routing: starting {provider.name} ({reason[:-1]})")
+                future = pool.submit(self._timed_call, provider, system_prompt, user_prompt)
+                now = time.monotonic()
+                pending[future] = (provider, now + provider.deadline, reason)
+                hedge_at = now + self.hedge_delay(provider) if self.hedging else float('inf')
+                return True
+            return False
+
+        if not start_next():
+            raise Exception("All LLM providers are unavailable (circuit breakers open).")
+        while pending:
+            now = time.monotonic()
+            wake_at = min(deadline for _, deadline, _ in pending.values())
+            if next_index < len(order):
+                wake_at = min(wake_at, hedge_at)
+            done, _ = wait(list(pending), timeout=max(0.0, wake_at - now), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                provider, _, reason = pending.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    print(f"{provider.name} API Failed: {e}")
+                    last_error = e
+                    continue
+                if reason == 'hedges':
+                    self._count('hedge_wins')
+                return text, provider
+
+            now = time.monotonic()
+            for future, (provider, deadline, _) in list(pending.items()):
+                if now >= deadline:
+                    # The call keeps running in its thread (the SDK timeout ends it); stop waiting for it
+                    del pending[future]
+                    self._count('timeouts')
+                    last_error = TimeoutError(f"{provider.name} did not answer within {provider.deadline:.0f}s")
+                    print(f"LLM routing: {last_error}")
+
+            if next_index < len(order):
+                if not pending:
+                    start_next('fallbacks')
+                elif now >= hedge_at:
+                    start_next('hedges')
+
+        raise last_error
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        providers = self.tracker.stats()
+        with self._lock:
+            breakers = dict(self._breakers)
+        for name, breaker in breakers.items():
+            providers.setdefault(name, {})['breaker'] = breaker.stats()
+        counters['providers'] = providers
+        return counters
+
+    def _timed_call(self, provider, system_prompt, user_prompt):
+        started = time.perf_counter()
+        try:
+            text = provider.call(system_prompt, user_prompt, provider.deadline)
+        except Exception as e:
+            self.record(provider, max(time.perf_counter() - started, provider.deadline), error=e)
+            raise
+        self.record(provider, time.perf_counter() - started)
+        return text
+
+    def record(self, provider, seconds, error=None):
+        """
+        Feeds one call's outcome to the latency tracker and the provider's breaker.
+        """
+        self.tracker.record(provider.name, seconds, ok=error is None)
+        self.breaker(provider.name).record(error is None, error)
+
+    def _executor(self):
+        # Created on first use in each process (a pool inherited through fork has no threads)
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='llm')
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
@@ -1,66 +1,197 @@
 import os
-import google.generativeai as genai
-from openai import OpenAI
+import threading
+import time
+from ..config import Config
+from .llm_cache import llm_cache
+from .llm_routing import LLMRouter, LatencyTracker, Provider
+
+GEMINI_MODEL = 'gemini-2.5-flash'
+GROQ_MODEL = 'llama-3.3-70b-versatile'
 
 class LLMService:
     def __init__(self):
-        # 1. Configure Gemini (Primary)
+        # SDK imports and client setup happen on first use (or in the warm-up thread), not at import
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._gemini_model = None
+        self._groq_client = None
         self.gemini_key = os.getenv("GEMINI_API_KEY")
-        self.gemini_model = None
-        if self.gemini_key:
-            try:
-                genai.configure(api_key=self.gemini_key)
-                self.gemini_model = genai.GenerativeModel('gemini-2.5-flash')
-            except Exception as e:
-                print(f"Gemini Init Error: {e}")
-
-        # 2. Configure Groq (Fallback)
-        # Groq uses the OpenAI SDK but points to their own high-speed API servers
         self.groq_key = os.getenv("GROQ_API_KEY")
-        self.groq_client = None
-        if self.groq_key:
-            try:
-                self.groq_client = OpenAI(
-                    base_url="https://api.groq.com/openai/v1",
-                    api_key=self.groq_key
-                )
-            except Exception as e:
-                print(f"Groq Init Error: {e}")
+        self.router = LLMRouter(
+            tracker=LatencyTracker(alpha=Config.LLM_EWMA_ALPHA, reset_after=Config.LLM_EWMA_RESET),
+            hedging=Config.LLM_HEDGING,
+            hedge_after=Config.LLM_HEDGE_AFTER,
+            breaker_options={
+                'failure_rate': Config.LLM_BREAKER_FAILURE_RATE,
+                'min_calls': Config.LLM_BREAKER_MIN_CALLS,
+                'window': Config.LLM_BREAKER_WINDOW,
+                'cooldown': Config.LLM_BREAKER_COOLDOWN,
+            }
+        )
+
+    def _init_clients(self):
+        if self._initialized:
+            return
+        with self._lock:
+            if self._initialized:
+                return
+
+            # 1. Configure Gemini (Primary)
+            if self.gemini_key:
+                try:
+                    import google.generativeai as genai
+                    genai.configure(api_key=self.gemini_key)
+                    self._gemini_model = genai.GenerativeModel(GEMINI_MODEL)
+                except Exception as e:
+                    print(f"Gemini Init Error: {e}")
+
+            # 2. Configure Groq (Fallback)
+            # Groq uses the OpenAI SDK but points to their own high-speed API servers
+            if self.groq_key:
+                try:
+                    from openai import OpenAI
+                    self._groq_client = OpenAI(
+                        base_url="https://api.groq.com/openai/v1",
+                        api_key=self.groq_key
+                    )
+                except Exception as e:
+                    print(f"Groq Init Error: {e}")
+
+            self._initialized = True
+
+    @property
+    def gemini_model(self):
+        self._init_clients()
+        return self._gemini_model
+
+    @property
+    def groq_client(self):
+        self._init_clients()
+        return self._groq_client
+
+    def warm_up(self):
+        """
+        Imports the SDKs and builds the clients now instead of on the first LLM request.
+        """
+        self._init_clients()
+
+    @property
+    def status(self):
+        """
+        pending (not initialized yet), ready (a provider is available) or degraded
+        (none is configured, or every provider's circuit breaker is open).
+        """
+        if not self._initialized:
+            return 'pending'
+        available = [p for p in self._providers() if self.router.breaker(p.name).state != 'open']
+        return 'ready' if available else 'degraded'
 
-    def generate_text(self, system_prompt, user_prompt):
+    def _providers(self):
         """
-        Generates text using Gemini (Primary) or Groq (Fallback).
+        Configured providers, Gemini (Primary) then Groq (Fallback); the router may reorder them.
         """
-        # --- Attempt 1: Gemini ---
+        providers = []
         if self.gemini_model:
-            try:
-                combined_prompt = f"{system_prompt}\n\nUser Request: {user_prompt}"
-                response = self.gemini_model.generate_content(combined_prompt)
-                return response.text
-            except Exception as e:
-                print(f"Gemini API Failed: {e}")
-                # If Groq is not configured, we must fail here
-                if not self.groq_client:
-                    raise e
-        
-        # --- Attempt 2: Groq (Fallback) ---
+            providers.append(Provider('gemini', GEMINI_MODEL, self._call_gemini, Config.LLM_DEADLINES['gemini']))
         if self.groq_client:
-            print("Switching to Groq (Llama 3)...")
+            providers.append(Provider('groq', GROQ_MODEL, self._call_groq, Config.LLM_DEADLINES['groq']))
+        return providers
+
+    def generate_text(self, system_prompt, user_prompt, cache=None, expects_json=False):
+        """
+        Generates text using Gemini or Groq (see llm_routing: fastest first, with deadlines and hedging).
+        - cache: endpoint name in Config.LLM_CACHE_TTLS; identical prompts within its TTL
+          are answered from the response cache (None always calls the provider)
+        - expects_json: only cache responses that parse as JSON
+        """
+        if not llm_cache.ttl(cache):
+            return self._generate(system_prompt, user_prompt)[0]
+
+        keys = [llm_cache.key(p.name, p.model, system_prompt, user_prompt) for p in self._providers()]
+        cached = llm_cache.get(keys)
+        if cached is not None:
+            return cached
+
+        text, provider, model = self._generate(system_prompt, user_prompt)
+        llm_cache.put(llm_cache.key(provider, model, system_prompt, user_prompt), text, cache, expects_json)
+        return text
+
+    def _generate(self, system_prompt, user_prompt):
+        """
+        Returns (text, provider, model).
+        """
+        text, provider = self.router.generate(self._providers(), system_prompt, user_prompt)
+        return text, provider.name, provider.model
+
+    def _call_gemini(self, system_prompt, user_prompt, timeout):
+        combined_prompt = f"{system_prompt}\n\nUser Request: {user_prompt}"
+        response = self.gemini_model.generate_content(combined_prompt, request_options={'timeout': timeout})
+        return response.text
+
+    def _call_groq(self, system_prompt, user_prompt, timeout):
+        response = self.groq_client.chat.completions.create(
+            model=GROQ_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.4,
+            timeout=timeout
+        )
+        return response.choices[0].message.content
+
+    def stream_text(self, system_prompt, user_prompt):
+        """
+        Generator over the reply's text chunks as the provider produces them,
+        Gemini (Primary) or Groq (Fallback), skipping providers whose circuit breaker is open.
+        Falls back only if a provider fails before sending anything; a stream that breaks midway raises.
+        """
+        streams = {'gemini': self._stream_gemini, 'groq': self._stream_groq}
+        last_error = None
+        for provider in self._providers():
+            if not self.router.breaker(provider.name).acquire():
+                print(f"Skipping {provider.name} (circuit open)")
+                continue
+            started = False
+            error = None
+            began = time.perf_counter()
             try:
-                # Use Llama 3 8B (Fast & Free Tier friendly)
-                response = self.groq_client.chat.completions.create(
-                    model="llama-3.3-70b-versatile", 
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=0.4
-                )
-                return response.choices[0].message.content
+                for text in streams[provider.name](system_prompt, user_prompt, provider.deadline):
+                    started = True
+                    yield text
+                return
             except Exception as e:
-                print(f"Groq API Failed: {e}")
-                raise e # Both providers failed
-        
-        raise Exception("No LLM provider configured or available.")
+                print(f"{provider.name} API Failed: {e}")
+                error = last_error = e
+                if started:
+                    raise
+            finally:
+                # Also reached when the client disconnects mid-stream (counts as a success)
+                self.router.record(provider, time.perf_counter() - began, error=error)
+
+        raise last_error or Exception("No LLM provider configured or available.")
+
+    def _stream_gemini(self, system_prompt, user_prompt, timeout):
+        combined_prompt = f"{system_prompt}\n\nUser Request: {user_prompt}"
+        response = self.gemini_model.generate_content(combined_prompt, stream=True, request_options={'timeout': timeout})
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    def _stream_groq(self, system_prompt, user_prompt, timeout):
+        stream = self.groq_client.chat.completions.create(
+            model=GROQ_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.4,
+            stream=True,
+            timeout=timeout
+        )
+        for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                yield text
 
 llm_service = LLMService()
\ No newline at end of file
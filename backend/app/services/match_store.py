@@ -0,0 +1,294 @@
+import os
+import queue
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import and_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import selectinload
+from ..config import Config
+from ..database import db
+from ..models import Job, MatchScore, Profile, User
+from .matching_service import matching_service
+
+# Dialects with INSERT ... ON CONFLICT; rows per statement stay well under SQLite's bound-parameter limit
+UPSERT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+UPSERT_CHUNK_SIZE = 500
+PROFILE_CHANGE_LAG = timedelta(seconds=30)
+
+class MatchStore:
+    """
+    Persisted candidate x job match scores (the `match_scores` table).
+    Reads order by the stored score in SQL; rows that don't exist yet are
+    scored live and written back. Job and profile changes are rescored by a
+    background worker that only touches the affected rows.
+    """
+    def __init__(self):
+        self.app = None
+        self._lock = threading.Lock()
+        self._queue = None
+        self._pending = set()
+        self._thread = None
+        self._pid = None
+        self._profiles_checked_at = None
+
+    def init_app(self, app):
+        self.app = app
+
+    # --- Reads ---
+
+    def _version_join(self, user_id):
+        return and_(
+            MatchScore.job_id == Job.id,
+            MatchScore.user_id == user_id,
+            MatchScore.algorithm_version == matching_service.algorithm_version
+        )
+
+    def ensure_scores(self, user_id, profile):
+        """
+        Scores (in one batch) and stores every job that has no row yet for this user.
+        """
+        missing_jobs = (Job.query
+                        .outerjoin(MatchScore, self._version_join(user_id))
+                        .filter(MatchScore.job_id.is_(None))
+                        .all())
+        if not missing_jobs:
+            return
+
+        scores = matching_service.score_many(profile, missing_jobs)
+        # Rows a concurrent request or the refresher stored first are kept as they are
+        self._upsert_scores([(user_id, job.id, score) for job, score in zip(missing_jobs, scores)], overwrite=False)
+
+    def _upsert_scores(self, rows, overwrite):
+        """
+        Stores (user_id, job_id, score) rows for the current algorithm version with
+        INSERT ... ON CONFLICT, so rows written concurrently don't fail (and roll back) the batch.
+        - overwrite: update the score of rows that already exist, or leave them alone
+        """
+        version = matching_service.algorithm_version
+        now = datetime.utcnow()
+        dialect = db.engine.dialect.name
+        if dialect not in UPSERT_INSERTS:
+            # No portable upsert: merge row by row (last writer wins)
+            for user_id, job_id, score in rows:
+                row = db.session.get(MatchScore, (user_id, job_id, version))
+                if row is None:
+                    db.session.add(MatchScore(user_id=user_id, job_id=job_id, algorithm_version=version, score=score))
+                elif overwrite:
+                    row.score = score
+            db.session.commit()
+            return
+
+        insert = UPSERT_INSERTS[dialect]
+        keys = ['user_id', 'job_id', 'algorithm_version']
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            stmt = insert(MatchScore).values([
+                {'user_id': user_id, 'job_id': job_id, 'algorithm_version': version, 'score': score, 'updated_at': now}
+                for user_id, job_id, score in rows[start:start + UPSERT_CHUNK_SIZE]
+            ])
+            if overwrite:
+                stmt = stmt.on_conflict_do_update(index_elements=keys, set_={
+                    'score': stmt.excluded.score, 'updated_at': stmt.excluded.updated_at
+                })
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=keys)
+            db.session.execute(stmt)
+        db.session.commit()
+
+    def ranked_jobs_query(self, user_id):
+        """
+        Query of (Job, score) for a user, best match first.
+        """
+        return (db.session.query(Job, MatchScore.score)
+                .join(MatchScore, self._version_join(user_id))
+                .order_by(MatchScore.score.desc(), Job.id.asc()))
+
+    def has_all_scores(self, user_id):
+        stored = MatchScore.query.filter_by(
+            user_id=user_id, algorithm_version=matching_service.algorithm_version
+        ).count()
+        return stored >= Job.query.count()
+
+    def recommend(self, user_id, profile, limit=5, min_score=70):
+        """
+        Returns up to `limit` (Job, score) pairs scoring above `min_score`, best first.
+        Uses the stored scores when they cover the catalogue. Otherwise jobs are
+        shortlisted by vector similarity (ANN) and keyword overlap (inverted index),
+        the shortlist is scored exactly, and the missing rows are backfilled in the background.
+        """
+        if self.has_all_scores(user_id):
+            return (self.ranked_jobs_query(user_id)
+                    .filter(MatchScore.score > min_score)
+                    .limit(limit)
+                    .all())
+
+        self._index_catalogue()
+        job_ids = matching_service.shortlist_jobs(
+            profile, Config.RECOMMENDATION_SHORTLIST_SIZE, min_score=min_score
+        )
+        jobs = Job.query.filter(Job.id.in_(job_ids)).all() if job_ids else []
+        scored = [(job, score) for job, score in zip(jobs, matching_service.score_many(profile, jobs)) if score > min_score]
+        scored.sort(key=lambda pair: (-pair[1], pair[0].id))
+
+        self.enqueue_backfill(user_id)
+        return scored[:limit]
+
+    def _index_catalogue(self):
+        """
+        Makes sure every job is in the matching indexes (first use, or jobs added elsewhere).
+        """
+        if len(matching_service.ann_index) >= Job.query.count():
+            return
+        indexed = matching_service.ann_index
+        missing_ids = [job_id for (job_id,) in db.session.query(Job.id) if job_id not in indexed]
+        if missing_ids:
+            matching_service.index_jobs(Job.query.filter(Job.id.in_(missing_ids)).all())
+
+    def top_candidates(self, job, min_score=0, page=1, limit=20):
+        """
+        Ranks every candidate profile against a job.
+        Returns (total matching candidates, [(user_id, score)] for the requested page).
+        """
+        self._index_candidates()
+        ranked = [(user_id, score) for user_id, score in matching_service.rank_profiles(job) if score >= min_score]
+        ranked.sort(key=lambda pair: (-pair[1], pair[0]))
+        start = (page - 1) * limit
+        return len(ranked), ranked[start:start + limit]
+
+    def warm_indexes(self):
+        """
+        Builds the job and candidate matching indexes up front (e.g. in a pre-fork master).
+        """
+        self._index_catalogue()
+        self._index_candidates()
+
+    def _candidate_profiles_query(self):
+        return Profile.query.join(User, Profile.user_id == User.id).filter(User.role == 'candidate')
+
+    def _index_candidates(self):
+        """
+        Keeps the ranking index in step with the candidate profiles: only the profiles
+        changed since the last check (Profile.updated_at) are loaded, and re-indexed if
+        their text changed; deleted profiles are dropped.
+        """
+        indexed = matching_service.profile_index
+        query = self._candidate_profiles_query()
+        changed = query.options(selectinload(Profile.experiences), selectinload(Profile.educations))
+        if self._profiles_checked_at is not None:
+            # Look back a little: a row flushed before the last check may have committed after it
+            changed = changed.filter(Profile.updated_at >= self._profiles_checked_at - PROFILE_CHANGE_LAG)
+        checked_at = datetime.utcnow()
+        stale = [profile for profile in changed.all()
+                 if indexed.signature(profile.id) != matching_service.profile_signature(profile)]
+        if stale:
+            matching_service.index_profiles(stale)
+        self._profiles_checked_at = checked_at
+
+        if len(indexed) != query.count():
+            current = {profile_id for (profile_id,) in query.with_entities(Profile.id)}
+            for profile_id in indexed.profile_ids() - current:
+                indexed.remove(profile_id)
+            missing = current - indexed.profile_ids()
+            if missing:
+                matching_service.index_profiles(
+                    query.options(selectinload(Profile.experiences), selectinload(Profile.educations))
+                    .filter(Profile.id.in_(missing)).all())
+
+    # --- Refresh ---
+
+    def refresh_user(self, user_id):
+        """
+        Rescores the stored rows of one candidate (their profile changed).
+        """
+        profile = Profile.query.filter_by(user_id=user_id).first()
+        rows = MatchScore.query.filter_by(
+            user_id=user_id, algorithm_version=matching_service.algorithm_version
+        ).all()
+        if not profile or not rows:
+            return
+
+        jobs = Job.query.filter(Job.id.in_([row.job_id for row in rows])).all()
+        scores = dict(zip([job.id for job in jobs], matching_service.score_many(profile, jobs)))
+        for row in rows:
+            if row.job_id in scores:
+                row.score = scores[row.job_id]
+        db.session.commit()
+
+    def refresh_job(self, job_id):
+        """
+        Rescores one job for every candidate that has stored scores (job created or updated).
+        """
+        job = Job.query.get(job_id)
+        if not job:
+            return
+
+        version = matching_service.algorithm_version
+        user_ids = [user_id for (user_id,) in (db.session.query(MatchScore.user_id)
+                                               .filter(MatchScore.algorithm_version == version)
+                                               .distinct())]
+        if not user_ids:
+            return
+
+        profiles = Profile.query.filter(Profile.user_id.in_(user_ids)).all()
+        scores = matching_service.score_profiles(profiles, job)
+        self._upsert_scores([(profile.user_id, job_id, score) for profile, score in zip(profiles, scores)], overwrite=True)
+
+    def backfill_user(self, user_id):
+        """
+        Stores scores for every job the candidate has no row for yet.
+        """
+        profile = Profile.query.filter_by(user_id=user_id).first()
+        if profile:
+            self.ensure_scores(user_id, profile)
+
+    def enqueue_user(self, user_id):
+        self._enqueue(('user', user_id))
+
+    def enqueue_backfill(self, user_id):
+        self._enqueue(('backfill', user_id))
+
+    def enqueue_job(self, job_id):
+        self._enqueue(('job', job_id))
+
+    def _enqueue(self, task):
+        if self.app is None or not self.app.config.get('MATCH_REFRESH_ASYNC', True):
+            self._run(task)
+            return
+
+        with self._lock:
+            self._ensure_worker()
+            if task in self._pending:
+                return # Already queued, the refresh will pick up the latest data
+            self._pending.add(task)
+            self._queue.put(task)
+
+    def _ensure_worker(self):
+        # (Re)start the worker lazily, also after the process was forked
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._worker, name='match-refresher', daemon=True)
+        self._thread.start()
+
+    def _worker(self):
+        while True:
+            task = self._queue.get()
+            with self._lock:
+                self._pending.discard(task)
+            try:
+                with self.app.app_context():
+                    self._run(task)
+            except Exception as e:
+                print(f"Match refresh failed for {task}: {e}")
+
+    def _run(self, task):
+        kind, target_id = task
+        if kind == 'user':
+            self.refresh_user(target_id)
+        elif kind == 'job':
+            self.refresh_job(target_id)
+        elif kind == 'backfill':
+            self.backfill_user(target_id)
+
+match_store = MatchStore()
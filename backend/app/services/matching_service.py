@@ -1,18 +1,75 @@
-import spacy
 import json
+import os
 import re
+import threading
+import numpy as np
+from pypdf import PdfReader
 from .llm_service import llm_service
+from .job_index import JobFeatureIndex, JobFeatures
+from .profile_cache import ProfileFeatureCache, ProfileFeatures
+from .ann_index import IVFIndex
+from .profile_index import ProfileMatrixIndex
+from ..config import Config
+
+# Components scoring never reads: it only needs tokens, lemmas (tagger + attribute_ruler
+# + lemmatizer, all fed by tok2vec), stop-word flags and static vectors.
+SCORING_EXCLUDED_PIPES = ["parser", "ner"]
 
 class MatchingService:
+    # Stored with persisted match scores; bump whenever the scoring formula changes
+    algorithm_version = "v1"
+
     def __init__(self):
+        # The spaCy model is loaded on first use (or by the warm-up thread), not at import
+        self._nlp = None
+        self._nlp_lock = threading.Lock()
+        # pending -> loading -> ready | degraded (blank fallback model)
+        self.status = 'pending'
+
+        # Per-job vectors and core lemmas, so listings don't re-parse every posting
+        self.job_index = JobFeatureIndex()
+        # Per-profile lemmas and vector, keyed by a hash of the profile content
+        self.profile_cache = ProfileFeatureCache(max_size=Config.PROFILE_FEATURE_CACHE_SIZE)
+        # Approximate nearest-neighbour index over job vectors (recommendation shortlists)
+        self.ann_index = IVFIndex(nprobe=Config.ANN_NPROBE, min_train_size=Config.ANN_MIN_TRAIN_SIZE)
+        # Candidate profile vectors + lemma postings (ranking candidates for a job)
+        self.profile_index = ProfileMatrixIndex()
+
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            with self._nlp_lock:
+                if self._nlp is None:
+                    self._nlp = self._load_nlp()
+        return self._nlp
+
+    @nlp.setter
+    def nlp(self, value):
+        with self._nlp_lock:
+            self._nlp = value
+            self.status = 'ready'
+
+    def _load_nlp(self):
+        self.status = 'loading'
+        import spacy
         try:
-            print("Loading spaCy model...")
+            print(f"Loading spaCy model ({Config.SPACY_PIPELINE} pipeline)...")
             # Ensure you have run: python -m spacy download en_core_web_md
-            self.nlp = spacy.load("en_core_web_md")
+            exclude = SCORING_EXCLUDED_PIPES if Config.SPACY_PIPELINE == 'scoring' else []
+            nlp = spacy.load("en_core_web_md", exclude=exclude)
             print("spaCy model loaded successfully.")
+            self.status = 'ready'
         except OSError:
             print("WARNING: 'en_core_web_md' model not found. Using blank model.")
-            self.nlp = spacy.blank("en")
+            nlp = spacy.blank("en")
+            self.status = 'degraded'
+        return nlp
+
+    def warm_up(self):
+        """
+        Loads the spaCy model now instead of on the first scoring request.
+        """
+        return self.nlp
 
     def _clean_text(self, text):
         if not text:
@@ -25,10 +82,24 @@ class MatchingService:
         """
         Extracts base forms of words (lemmas) to match 'Analyzing' with 'Analysis'.
         """
-        doc = self.nlp(self._clean_text(text))
+        return self._lemmas_of(self.nlp(self._clean_text(text)))
+
+    def _lemmas_of(self, doc):
         # Filter out stop words, punctuation, and short junk
         return set([token.lemma_ for token in doc if not token.is_stop and not token.is_punct and len(token.text) > 2])
 
+    def _pipe(self, texts):
+        return self.nlp.pipe(texts, batch_size=Config.NLP_BATCH_SIZE, n_process=Config.NLP_N_PROCESS)
+
+    def _features_many(self, lemma_texts, vector_texts):
+        """
+        Batch version of _get_lemmas + doc vector: parses all texts with nlp.pipe.
+        Returns a list of (lemmas, normalized vector), one per text pair.
+        """
+        lemmas = [self._lemmas_of(doc) for doc in self._pipe(self._clean_text(text) for text in lemma_texts)]
+        vectors = [self._normalized_vector(doc) for doc in self._pipe(text[:100000] for text in vector_texts)]
+        return list(zip(lemmas, vectors))
+
     def _construct_profile_text(self, profile):
         """
         Constructs a text representation of the candidate profile.
@@ -111,78 +182,330 @@ class MatchingService:
             
         return ". ".join(text_parts)
 
-    def calculate_score(self, profile, job):
+    def _construct_job_core_text(self, job):
+        """
+        Constructs the "Must Haves" text for keyword matching (title + tags only).
+        """
+        job_core_text = f"{job.title} {job.title}" # Double weight on title
+        if job.tags:
+            job_core_text += f" {job.tags.replace(',', ' ')}"
+        return job_core_text
+
+    def _normalized_vector(self, doc):
+        """
+        Returns the doc vector scaled to unit length, so cosine similarity is a dot product.
+        Docs without a vector map to a zero vector (similarity 0.0, as spaCy returns).
+        Kept in float32, the precision Doc.similarity computes in.
+        """
+        vector = np.asarray(doc.vector, dtype=np.float32)
+        norm = doc.vector_norm
+        if not norm:
+            return np.zeros_like(vector)
+        return vector / np.float32(norm)
+
+    def index_job(self, job):
+        """
+        Builds the scoring features for a job and stores them in the job index.
+        Called when a job is created or updated; reads rebuild stale entries lazily.
+        """
+        return self.index_jobs([job])[0]
+
+    def index_jobs(self, jobs):
+        """
+        Batch version of index_job (one nlp.pipe pass). Returns features in the order of `jobs`.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return []
+
+        computed = self._features_many(
+            [self._construct_job_core_text(job) for job in jobs],
+            [self._construct_job_text_for_vector(job) for job in jobs]
+        )
+        features = [
+            JobFeatures(signature=JobFeatureIndex.signature(job), vector=vector, lemmas=lemmas)
+            for job, (lemmas, vector) in zip(jobs, computed)
+        ]
+
+        indexed = [(job.id, f) for job, f in zip(jobs, features) if getattr(job, 'id', None) is not None]
+        for job_id, f in indexed:
+            self.job_index.put(job_id, f)
+        if indexed:
+            self.ann_index.add_many([job_id for job_id, _ in indexed], [f.vector for _, f in indexed])
+        return features
+
+    def remove_job(self, job_id):
+        self.job_index.remove(job_id)
+        self.ann_index.remove(job_id)
+
+    def _get_job_features(self, job):
+        return self._get_job_features_many([job])[0]
+
+    def _get_job_features_many(self, jobs):
+        """
+        Returns indexed features for each job; missing or stale ones are built in one batch.
+        """
+        features = [self.job_index.get(job) if getattr(job, 'id', None) is not None else None for job in jobs]
+        missing = [i for i, f in enumerate(features) if f is None]
+        if missing:
+            for i, f in zip(missing, self.index_jobs([jobs[i] for i in missing])):
+                features[i] = f
+        return features
+
+    def _get_profile_features(self, profile):
+        """
+        Returns the (cached) lemmas and normalized vector for a candidate profile
+        or parsed resume dict. The profile text is parsed at most once per content.
+        """
+        return self._get_profile_features_many([profile])[0]
+
+    def _get_profile_features_many(self, profiles):
+        """
+        Batch version of _get_profile_features: uncached profiles are parsed in one nlp.pipe pass.
+        """
+        texts = [self._construct_profile_text(profile) for profile in profiles]
+        keys = [ProfileFeatureCache.key(text) for text in texts]
+        features = [self.profile_cache.get(key) for key in keys]
+
+        missing = {}
+        for i, f in enumerate(features):
+            if f is None:
+                missing.setdefault(keys[i], []).append(i)
+        if missing:
+            first = [rows[0] for rows in missing.values()]
+            computed = self._features_many([texts[i] for i in first], [texts[i] for i in first])
+            for (key, rows), (lemmas, vector) in zip(missing.items(), computed):
+                f = ProfileFeatures(lemmas=lemmas, vector=vector)
+                profile = profiles[rows[0]]
+                owner_id = None if isinstance(profile, dict) else getattr(profile, 'id', None)
+                self.profile_cache.put(key, f, owner_id=owner_id)
+                for i in rows:
+                    features[i] = f
+        return features
+
+    def shortlist_jobs(self, profile, size, min_score=None):
+        """
+        Returns ids of up to `size` indexed jobs whose vectors are closest to the
+        profile (approximate). Candidates should be re-scored with score_many.
+        With `min_score`, jobs whose keyword overlap can't reach it are dropped and
+        the jobs with the best keyword overlap are added, so keyword-heavy matches
+        aren't lost to the vector-only shortlist.
+        """
+        if not self.nlp.has_pipe("tok2vec"):
+            return []
+        profile_features = self._get_profile_features(profile)
+        job_ids = [job_id for job_id, _ in self.ann_index.search(profile_features.vector, size)]
+        if min_score is None:
+            return job_ids
+
+        keyword_ids = self.keyword_candidates(profile_features.lemmas, min_score)
+        if keyword_ids is None:
+            return job_ids # Threshold too low to rule anything out
+        eligible = set(keyword_ids)
+        shortlist = [job_id for job_id in job_ids if job_id in eligible]
+        seen = set(shortlist)
+        shortlist.extend(job_id for job_id in keyword_ids[:size] if job_id not in seen)
+        return shortlist
+
+    def keyword_candidates(self, lemmas, min_score):
+        """
+        Returns ids of indexed jobs that could score above `min_score` given their keyword
+        overlap with `lemmas` (assuming a perfect semantic match), best overlap first.
+        Returns None when even jobs without any overlap could pass.
+        """
+        # The score never decreases with the semantic part, so a full semantic score gives an upper bound
+        if self._combine_scores([0], [1], [1.0])[0] > min_score:
+            return None
+
+        counts = self.job_index.overlap_counts(lemmas)
+        if not counts:
+            return []
+        core_sizes = self.job_index.core_sizes(counts) # only the jobs sharing a lemma
+        job_ids = [job_id for job_id in counts if job_id in core_sizes]
+        overlap = [counts[job_id] for job_id in job_ids]
+        sizes = [core_sizes[job_id] for job_id in job_ids]
+        bounds = self._combine_scores(overlap, sizes, np.ones(len(job_ids)))
+
+        ratio = {job_id: o / s for job_id, o, s in zip(job_ids, overlap, sizes)}
+        eligible = [job_id for job_id, bound in zip(job_ids, bounds) if bound > min_score]
+        eligible.sort(key=lambda job_id: (-ratio[job_id], job_id))
+        return eligible
+
+    def index_profile(self, profile):
+        """
+        Adds (or refreshes) a stored profile in the candidate ranking index.
+        """
+        self.index_profiles([profile])
+
+    def index_profiles(self, profiles):
+        profiles = list(profiles)
+        for profile, features in zip(profiles, self._get_profile_features_many(profiles)):
+            self.profile_index.add(profile.id, profile.user_id, features, signature=self.profile_signature(profile))
+
+    def profile_signature(self, profile):
+        """
+        Hash of the text a stored profile's features are built from; changes with any edit that affects scoring.
+        """
+        return ProfileFeatureCache.key(self._construct_profile_text(profile))
+
+    def invalidate_profile(self, profile_id):
+        """
+        Drops cached features for a stored profile after its data changed.
+        """
+        self.profile_cache.invalidate(profile_id)
+        self.profile_index.remove(profile_id)
+
+    def rank_profiles(self, job):
+        """
+        Scores one job against every indexed profile in a single pass.
+        Returns a list of (user_id, score), unsorted.
+        """
         try:
             if not self.nlp.has_pipe("tok2vec"):
-                return 0.0
+                return []
 
-            # --- CORE KEYWORD MATCH (The "Hard" Skills) ---
-            # We derive the "Must Haves" strictly from Job Title and Tags.
-            # We ignore the description body for this part to avoid noise.
-            
-            job_core_text = f"{job.title} {job.title}" # Double weight on title
-            if job.tags:
-                job_core_text += f" {job.tags.replace(',', ' ')}"
-            
-            job_core_lemmas = self._get_lemmas(job_core_text)
-            
-            # Profile "Searchable" text
-            profile_search_text = self._construct_profile_text(profile)
-            profile_lemmas = self._get_lemmas(profile_search_text)
-            
-            # Calculate Overlap
-            if not job_core_lemmas:
-                keyword_score = 0.0
-            else:
-                intersection = job_core_lemmas.intersection(profile_lemmas)
-                raw_overlap = len(intersection) / len(job_core_lemmas)
-                
-                # CURVE THE SCORE:
-                # Matching 60% of tags is usually "Excellent". Matching 100% is rare.
-                # We multiply by 1.5 to boost good candidates (e.g., 0.6 -> 0.9).
-                keyword_score = min(raw_overlap * 1.5, 1.0)
+            job_features = self._get_job_features(job)
+            user_ids, overlap, raw_semantic = self.profile_index.score_components(job_features.lemmas, job_features.vector)
+            core_sizes = np.full(len(user_ids), len(job_features.lemmas), dtype=np.float64)
+            return list(zip(user_ids.tolist(), self._combine_scores(overlap, core_sizes, raw_semantic)))
 
-            # --- SEMANTIC CONTEXT MATCH (The "Soft" Skills) ---
-            # This uses the vectors to understand context (e.g. "Coding" ~ "Development")
-            
-            profile_vec_text = self._construct_profile_text(profile)
-            job_vec_text = self._construct_job_text_for_vector(job) # Includes description
+        except Exception as e:
+            print(f"Error ranking profiles: {e}")
+            return []
 
-            doc_profile = self.nlp(profile_vec_text[:100000])
-            doc_job = self.nlp(job_vec_text[:100000])
-            
-            raw_semantic = doc_profile.similarity(doc_job)
-            
-            # Normalize Vector Score:
-            # Vectors are generous. 0.7 is a baseline for "Professional English".
-            # We map 0.6 -> 0.0 and 0.95 -> 1.0
-            semantic_score = max(0, (raw_semantic - 0.6) * 2.5)
-            semantic_score = min(semantic_score, 1.0)
-
-            # --- 3. FINAL WEIGHTED SCORE ---
-            # If the candidate has the KEYWORDS, we trust them highly (65% weight).
-            # The Vector context helps separate good resumes from keyword stuffing (35% weight).
-            
-            final_score = (keyword_score * 0.65) + (semantic_score * 0.35)
+    def score_profiles(self, profiles, job):
+        """
+        Scores many profiles (or parsed resume dicts) against one job.
+        Uncached profiles are parsed in one batch. Returns scores in the order of `profiles`.
+        """
+        profiles = list(profiles)
+        if not profiles:
+            return []
 
-            # --- 4. ADJUSTMENTS ---
-            
-            # PENALTY: The "Nurse applying for SEO Specialist" case.
-            # If they miss almost ALL core keywords, the semantic score is likely a hallucination/noise.
-            if keyword_score < 0.2: 
-                final_score *= 0.4 # Crush the score.
-                
-            # BOOST: The "Expert" case.
-            # If they matched > 80% of tags (after curve), they are definitely a strong fit.
-            if keyword_score > 0.8:
-                final_score = max(final_score, 0.85)
-                
-            return float(min(round(final_score * 100, 1), 98.0))
+        try:
+            if not self.nlp.has_pipe("tok2vec"):
+                return [0.0] * len(profiles)
+
+            job_features = self._get_job_features(job)
+            return self._score_against_job(job_features, self._get_profile_features_many(profiles))
+
+        except Exception as e:
+            print(f"Error calculating scores: {e}")
+            return [0.0] * len(profiles)
+
+    def score_resume_texts(self, texts, job):
+        """
+        Scores raw resume texts against one job, parsed in one batch (nothing is cached).
+        Returns a list of (score, matched core lemmas, missing core lemmas).
+        """
+        texts = list(texts)
+        if not texts or not self.nlp.has_pipe("tok2vec"):
+            return [(0.0, [], []) for _ in texts]
+
+        job_features = self._get_job_features(job)
+        resume_features = [ProfileFeatures(lemmas=lemmas, vector=vector)
+                           for lemmas, vector in self._features_many(texts, texts)]
+        scores = self._score_against_job(job_features, resume_features)
+        return [
+            (score, sorted(job_features.lemmas & f.lemmas), sorted(job_features.lemmas - f.lemmas))
+            for score, f in zip(scores, resume_features)
+        ]
+
+    def _score_against_job(self, job_features, profile_features):
+        overlap = [len(job_features.lemmas & f.lemmas) for f in profile_features]
+        core_sizes = [len(job_features.lemmas)] * len(profile_features)
+        raw_semantic = np.vstack([f.vector for f in profile_features]) @ job_features.vector
+        return self._combine_scores(overlap, core_sizes, raw_semantic)
+
+    def _combine_scores(self, overlap, core_sizes, raw_semantic):
+        """
+        Applies the scoring formula to arrays of per-job components.
+        - overlap: number of job core lemmas found in the profile
+        - core_sizes: number of job core lemmas
+        - raw_semantic: cosine similarity of profile and job vectors
+        Returns a list of scores (0-98, one decimal), one per job.
+        """
+        overlap = np.asarray(overlap, dtype=np.float64)
+        core_sizes = np.asarray(core_sizes, dtype=np.float64)
+        # Doc.similarity returns a float32 value and the rest of the formula ran on Python floats
+        raw_semantic = np.asarray(raw_semantic, dtype=np.float32).astype(np.float64)
+
+        # --- CORE KEYWORD MATCH (The "Hard" Skills) ---
+        # Jobs without core lemmas get no keyword credit.
+        raw_overlap = np.divide(overlap, core_sizes, out=np.zeros_like(overlap), where=core_sizes > 0)
+
+        # CURVE THE SCORE:
+        # Matching 60% of tags is usually "Excellent". Matching 100% is rare.
+        # We multiply by 1.5 to boost good candidates (e.g., 0.6 -> 0.9).
+        keyword_score = np.minimum(raw_overlap * 1.5, 1.0)
+
+        # --- SEMANTIC CONTEXT MATCH (The "Soft" Skills) ---
+        # Normalize Vector Score:
+        # Vectors are generous. 0.7 is a baseline for "Professional English".
+        # We map 0.6 -> 0.0 and 0.95 -> 1.0
+        semantic_score = np.minimum(np.maximum(0.0, (raw_semantic - 0.6) * 2.5), 1.0)
+
+        # --- 3. FINAL WEIGHTED SCORE ---
+        # If the candidate has the KEYWORDS, we trust them highly (65% weight).
+        # The Vector context helps separate good resumes from keyword stuffing (35% weight).
+        final_score = (keyword_score * 0.65) + (semantic_score * 0.35)
+
+        # --- 4. ADJUSTMENTS ---
+
+        # PENALTY: The "Nurse applying for SEO Specialist" case.
+        # If they miss almost ALL core keywords, the semantic score is likely a hallucination/noise.
+        final_score = np.where(keyword_score < 0.2, final_score * 0.4, final_score)
+
+        # BOOST: The "Expert" case.
+        # If they matched > 80% of tags (after curve), they are definitely a strong fit.
+        final_score = np.where(keyword_score > 0.8, np.maximum(final_score, 0.85), final_score)
+
+        # Python's round() (not np.round) keeps results identical to the scalar formula
+        return [float(min(round(score * 100, 1), 98.0)) for score in final_score.tolist()]
+
+    def score_many(self, profile, jobs):
+        """
+        Scores one profile against many jobs in a single pass.
+        Job vectors are stacked into a matrix so all cosine similarities come
+        from one matrix-vector product. Returns scores in the order of `jobs`.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return []
+
+        try:
+            if not self.nlp.has_pipe("tok2vec"):
+                return [0.0] * len(jobs)
+
+            profile_features = self._get_profile_features(profile)
+            profile_lemmas = profile_features.lemmas
+            job_features = self._get_job_features_many(jobs)
+
+            # Overlap counts for every indexed job come from one sparse pass over the
+            # profile's lemmas; jobs without an id (not indexed) fall back to set intersection
+            counts = self.job_index.overlap_counts(profile_lemmas)
+            overlap = np.fromiter(
+                (counts.get(job.id, 0) if getattr(job, 'id', None) is not None else len(f.lemmas & profile_lemmas)
+                 for job, f in zip(jobs, job_features)),
+                dtype=np.float64, count=len(job_features)
+            )
+            core_sizes = np.fromiter(
+                (len(f.lemmas) for f in job_features),
+                dtype=np.float64, count=len(job_features)
+            )
+
+            job_matrix = np.vstack([f.vector for f in job_features])
+            raw_semantic = job_matrix @ profile_features.vector
+
+            return self._combine_scores(overlap, core_sizes, raw_semantic)
 
         except Exception as e:
-            print(f"Error calculating score: {e}")
-            return 0.0
-    
+            print(f"Error calculating scores: {e}")
+            return [0.0] * len(jobs)
+
+    def calculate_score(self, profile, job):
+        return self.score_many(profile, [job])[0]
+
     def parse_resume_with_llm(self, text):
         """
         Uses LLM to extract structured data while ignoring PII.
@@ -199,7 +522,9 @@ class MatchingService:
         }
         """
         try:
-            response_text = llm_service.generate_text(system_prompt, f"Resume Text:\n{text[:10000]}")
+            response_text = llm_service.generate_text(
+                system_prompt, f"Resume Text:\n{text[:10000]}", cache='resume-parse', expects_json=True
+            )
             if "```" in response_text:
                 response_text = response_text.replace("```json", "").replace("```", "")
             return json.loads(response_text)
@@ -207,6 +532,32 @@ class MatchingService:
             print(f"LLM Parsing Error: {e}")
             return {}
 
+    def parse_stored_resume(self, profile, upload_folder):
+        """
+        Parses the resume file uploaded to a profile (PDF or text) with parse_resume_with_llm.
+        Returns None when there is no readable resume; the same text is only sent to the LLM once (cached).
+        """
+        if not profile or not profile.resume:
+            return None
+        # profile.resume is stored as "/uploads/filename"
+        file_path = os.path.join(upload_folder, os.path.basename(profile.resume))
+        if not os.path.exists(file_path):
+            return None
+
+        resume_text = ""
+        if file_path.lower().endswith('.pdf'):
+            for page in PdfReader(file_path).pages:
+                extracted = page.extract_text()
+                if extracted:
+                    resume_text += extracted + "\n"
+        else:
+            # Fallback for text/md files
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                resume_text = f.read()
+        if not resume_text.strip():
+            return None
+        return self.parse_resume_with_llm(resume_text) or None
+
     def generate_explanation(self, profile, job, score):
         # Using the same construction logic as calculation for consistency
         profile_text = self._construct_profile_text(profile)
@@ -226,7 +577,7 @@ class MatchingService:
         user_prompt = f"CANDIDATE PROFILE:\n{profile_text[:3000]}\n\nJOB DESCRIPTION:\n{job_text[:3000]}"
         
         try:
-            response_text = llm_service.generate_text(system_prompt, user_prompt)
+            response_text = llm_service.generate_text(system_prompt, user_prompt, cache='explanation', expects_json=True)
             if "```" in response_text:
                 response_text = response_text.replace("```json", "").replace("```", "")
             return response_text
@@ -0,0 +1,36 @@
+from sqlalchemy import case, func
+from ..database import db
+from ..models import Employee, Performance
+
+
+def rating_stats_subquery(hired_by):
+    """
+    Review aggregates of one HR's employees: avg_rating (over rated reviews only) and review_count.
+    """
+    return (db.session.query(
+                Performance.employee_id,
+                func.avg(case((Performance.rating > 0, Performance.rating))).label('avg_rating'),
+                func.count(Performance.id).label('review_count'))
+            .join(Employee, Employee.id == Performance.employee_id)
+            .filter(Employee.hired_by == hired_by)
+            .group_by(Performance.employee_id)
+            .subquery())
+
+
+def ranked_reviews_subquery(hired_by):
+    """
+    Reviews of one HR's employees, numbered per employee from the most recent (review_rank = 1).
+    Undated reviews rank after the dated ones (NULLs sort first in a descending Postgres order).
+    """
+    return (db.session.query(
+                Performance.employee_id,
+                Performance.rating,
+                Performance.date,
+                Performance.comments,
+                func.row_number().over(
+                    partition_by=Performance.employee_id,
+                    order_by=(Performance.date.desc().nulls_last(), Performance.id.desc())
+                ).label('review_rank'))
+            .join(Employee, Employee.id == Performance.employee_id)
+            .filter(Employee.hired_by == hired_by)
+            .subquery())
@@ -0,0 +1,61 @@
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+# Scoring features derived from a candidate profile (or parsed resume).
+# - lemmas: set of lemmas from the profile text
+# - vector: L2-normalized document vector
+ProfileFeatures = namedtuple('ProfileFeatures', ['lemmas', 'vector'])
+
+
+class ProfileFeatureCache:
+    """
+    LRU-bounded cache of profile scoring features, keyed by a hash of the
+    profile content (summary, experiences, educations, skills).
+    Entries built from a stored Profile also remember their owner, so the
+    profile endpoints can drop them as soon as the data changes.
+    """
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._owner_keys = {}
+
+    @staticmethod
+    def key(profile_text):
+        return hashlib.sha1(profile_text.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            features = self._entries.get(key)
+            if features is not None:
+                self._entries.move_to_end(key)
+            return features
+
+    def put(self, key, features, owner_id=None):
+        with self._lock:
+            if owner_id is not None:
+                previous = self._owner_keys.get(owner_id)
+                if previous is not None and previous != key:
+                    self._entries.pop(previous, None)
+                self._owner_keys[owner_id] = key
+
+            self._entries[key] = features
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, owner_id):
+        with self._lock:
+            key = self._owner_keys.pop(owner_id, None)
+            if key is not None:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._owner_keys.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,112 @@
+import threading
+import numpy as np
+
+
+class ProfileMatrixIndex:
+    """
+    Candidate profiles laid out for one-job-vs-all-profiles scoring:
+    - a matrix of normalized profile vectors (one row per profile)
+    - an inverted index from lemma to the rows whose profile contains it
+    Rows are keyed by profile id and remember the owning user id and the signature
+    of the profile text they were built from, so edited profiles can be found and re-added.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._vectors = None # (capacity, dim) float32
+        self._user_ids = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._row_of = {}
+        self._signatures = {}
+        self._row_lemmas = {}
+        self._postings = {}
+        self._free_rows = []
+
+    def __len__(self):
+        with self._lock:
+            return len(self._row_of)
+
+    def __contains__(self, profile_id):
+        with self._lock:
+            return profile_id in self._row_of
+
+    def signature(self, profile_id):
+        """
+        Returns the signature a profile was indexed with, or None if it isn't indexed.
+        """
+        with self._lock:
+            return self._signatures.get(profile_id)
+
+    def profile_ids(self):
+        with self._lock:
+            return set(self._row_of)
+
+    def add(self, profile_id, user_id, features, signature=None):
+        vector = np.asarray(features.vector, dtype=np.float32)
+        with self._lock:
+            if profile_id in self._row_of:
+                self._drop_row(self._row_of.pop(profile_id))
+            self._signatures[profile_id] = signature
+
+            row = self._free_rows.pop() if self._free_rows else self._next_row(vector.shape[0])
+            self._vectors[row] = vector
+            self._user_ids[row] = user_id
+            self._alive[row] = True
+            self._row_of[profile_id] = row
+            self._row_lemmas[row] = features.lemmas
+            for lemma in features.lemmas:
+                self._postings.setdefault(lemma, set()).add(row)
+
+    def remove(self, profile_id):
+        with self._lock:
+            row = self._row_of.pop(profile_id, None)
+            self._signatures.pop(profile_id, None)
+            if row is not None:
+                self._drop_row(row)
+                self._free_rows.append(row)
+
+    def _drop_row(self, row):
+        self._alive[row] = False
+        self._vectors[row] = 0.0
+        for lemma in self._row_lemmas.pop(row, ()):
+            rows = self._postings.get(lemma)
+            if rows is not None:
+                rows.discard(row)
+                if not rows:
+                    del self._postings[lemma]
+
+    def _next_row(self, dim):
+        if self._vectors is None:
+            self._vectors = np.zeros((64, dim), dtype=np.float32)
+            self._user_ids = np.zeros(64, dtype=np.int64)
+            self._alive = np.zeros(64, dtype=bool)
+        elif self._size >= self._vectors.shape[0]:
+            extra = self._vectors.shape[0]
+            self._vectors = np.vstack([self._vectors, np.zeros((extra, dim), dtype=np.float32)])
+            self._user_ids = np.concatenate([self._user_ids, np.zeros(extra, dtype=np.int64)])
+            self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+        row = self._size
+        self._size += 1
+        return row
+
+    def score_components(self, lemmas, vector):
+        """
+        Returns (user_ids, overlap, raw_semantic) arrays over all live profiles for one job:
+        - overlap: how many of the job's core lemmas each profile contains, accumulated
+          sparsely from the inverted index (only profiles sharing a lemma are touched)
+        - raw_semantic: cosine similarity of each profile vector with the job vector
+        """
+        with self._lock:
+            if not self._row_of:
+                empty = np.zeros(0)
+                return np.zeros(0, dtype=np.int64), empty, empty
+
+            overlap = np.zeros(self._size, dtype=np.float64)
+            for lemma in lemmas:
+                rows = self._postings.get(lemma)
+                if rows:
+                    overlap[np.fromiter(rows, dtype=np.int64, count=len(rows))] += 1
+
+            raw_semantic = self._vectors[:self._size] @ np.asarray(vector, dtype=np.float32)
+            rows = np.flatnonzero(self._alive[:self._size])
+            return self._user_ids[rows].copy(), overlap[rows], raw_semantic[rows]
@@ -0,0 +1,45 @@
+import threading
+from .llm_service import llm_service
+from .matching_service import matching_service
+
+_thread = None
+
+
+def start_warmup():
+    """
+    Loads the spaCy model and the LLM clients in a background thread, so the
+    app serves requests that don't need them while the model is loading.
+    """
+    global _thread
+    _thread = threading.Thread(target=_warm_up, name='model-warmup', daemon=True)
+    _thread.start()
+    return _thread
+
+
+def _warm_up():
+    try:
+        matching_service.warm_up()
+        llm_service.warm_up()
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+
+
+def readiness():
+    """
+    Overall readiness from the component states: loading, degraded, lazy or ready.
+    A component that hasn't loaded yet is 'loading' while the warm-up thread is running,
+    and 'lazy' otherwise (warm-up disabled or finished): it loads on first use.
+    """
+    warming = _thread is not None and _thread.is_alive()
+    components = {'matching': matching_service.status, 'llm': llm_service.status}
+    components = {name: ('loading' if warming else 'lazy') if state == 'pending' else state
+                  for name, state in components.items()}
+    if any(state == 'loading' for state in components.values()):
+        overall = 'loading'
+    elif any(state == 'degraded' for state in components.values()):
+        overall = 'degraded'
+    elif any(state == 'lazy' for state in components.values()):
+        overall = 'lazy'
+    else:
+        overall = 'ready'
+    return overall, components
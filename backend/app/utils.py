@@ -1,42 +1,180 @@
-from flask import request, current_app
+from flask import request, current_app, abort, jsonify, make_response, g
+from itsdangerous import URLSafeSerializer, BadSignature
+from sqlalchemy import and_, or_, tuple_
+from datetime import datetime
 import jwt
 import re
-from .models import User
+import time
+from .database import db
+from .models import User, Profile
+from .services.identity_cache import legacy_identity_cache, token_cache
+
+
+class CurrentUser:
+    """
+    The authenticated user of a request. `id` and `role` come from the token claims;
+    the User row is only loaded when a handler touches anything else (attribute reads
+    and writes are forwarded to it).
+    """
+    def __init__(self, user_id, role=None):
+        object.__setattr__(self, 'id', user_id)
+        object.__setattr__(self, '_role', role)
+        object.__setattr__(self, '_user', None)
+
+    @property
+    def user(self):
+        if self._user is None:
+            user = db.session.get(User, self.id)
+            if user is None:
+                # Valid token for a deleted account
+                abort(make_response(jsonify({'error': 'Unauthorized'}), 401))
+            object.__setattr__(self, '_user', user)
+        return self._user
+
+    @property
+    def role(self):
+        return self._role or self.user.role
+
+    def __getattr__(self, name):
+        return getattr(self.user, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.user, name, value)
+
+
+def get_bearer_token():
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    token = token.strip()
+    return token if scheme == 'Bearer' and token else None
+
+def decode_token(token):
+    """
+    Returns the verified claims of a JWT, or None if it is invalid or expired.
+    Claims are cached until the token expires, so repeat requests skip verification.
+    """
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+    try:
+        claims = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        return None
+    if claims.get('user_id') is None:
+        return None
+    ttl = claims['exp'] - time.time() if 'exp' in claims else None
+    token_cache.put(token, claims, ttl=ttl)
+    return claims
 
 def get_current_user():
     """
     Retrieves the current authenticated user from Authorization header (Bearer Token)
-    or legacy X-User-Id header.
+    or legacy X-User-Id header. Resolved once per request.
     """
+    if '_current_user' not in g:
+        g._current_user = _resolve_current_user()
+    return g._current_user
+
+def legacy_profile_query(legacy_id):
+    """
+    Profiles matching a legacy X-User-Id (first name + last phone digits), lowest user id first.
+    """
+    return Profile.query.filter_by(legacy_key=legacy_id).order_by(Profile.user_id)
+
+def _resolve_current_user():
     # 1. Try Bearer Token (Preferred)
-    auth_header = request.headers.get('Authorization', None)
-    if auth_header and auth_header.startswith('Bearer '):
-        token = auth_header.split(' ')[1]
-        try:
-            payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            user = User.query.get(payload.get('user_id'))
-            if user:
-                return user
-        except Exception:
-            pass # Fallback to legacy
+    token = get_bearer_token()
+    if token:
+        claims = decode_token(token)
+        if claims:
+            return CurrentUser(claims['user_id'], claims.get('role'))
+        # Invalid/expired token: fall back to legacy
 
     # 2. Legacy: X-User-Id
     user_id = request.headers.get('X-User-Id')
     if not user_id:
         return None
 
-    # user_id is now firstname+last 3 digits of phone
-    # Find user by matching first_name and last 3 digits of phone in profile
-    match = re.match(r"([A-Za-z]+)(\d{1,3})$", user_id)
-    if not match:
+    # user_id is firstname+last 3 digits of phone, stored as Profile.legacy_key
+    if not re.match(r"[A-Za-z]+\d{1,3}$", user_id):
+        return None
+    cached_id = legacy_identity_cache.get(user_id)
+    if cached_id is not None:
+        user = User.query.get(cached_id)
+        if user:
+            return user
+    profile = legacy_profile_query(user_id).first()
+    if not profile:
         return None
-    first_name, last3 = match.groups()
-    # Find all users with this first name
-    users = User.query.filter_by(first_name=first_name).all()
-    for user in users:
-        profile = user.profile
-        if profile and profile.phone:
-            phone_digits = ''.join(filter(str.isdigit, profile.phone))
-            if phone_digits[-3:] == last3:
-                return user
-    return None
+    legacy_identity_cache.put(user_id, profile.user_id)
+    return profile.user
+
+
+# --- Cursor (keyset) pagination ---
+
+def _cursor_serializer(scope):
+    # Signed with the app secret and salted per endpoint, so cursors can't be forged or reused elsewhere
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt=f"cursor:{scope}")
+
+def encode_cursor(scope, values):
+    encoded = [{'dt': v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    return _cursor_serializer(scope).dumps(encoded)
+
+def decode_cursor(scope, cursor):
+    """
+    Returns the key values stored in a cursor, or None if it is invalid or was tampered with.
+    """
+    try:
+        values = _cursor_serializer(scope).loads(cursor)
+    except BadSignature:
+        return None
+    if not isinstance(values, list):
+        return None
+    return [datetime.fromisoformat(v['dt']) if isinstance(v, dict) and 'dt' in v else v for v in values]
+
+def keyset_order(query, keys, after=None):
+    """
+    Orders a query by keyset `keys` ((column, descending) pairs) and, given the key values
+    of a row (`after`), keeps only the rows that come after it.
+    """
+    ordered = query.order_by(*[column.desc() if descending else column.asc() for column, descending in keys])
+    if after is None:
+        return ordered
+    columns = [column for column, _ in keys]
+    directions = {descending for _, descending in keys}
+    if len(directions) == 1:
+        # Same direction throughout: a row-value comparison the database can run as an index range
+        if directions.pop():
+            return ordered.filter(tuple_(*columns) < tuple(after))
+        return ordered.filter(tuple_(*columns) > tuple(after))
+    # (a, b, id) after (va, vb, vid): a past va, or a == va and b past vb, ...
+    conditions = []
+    for i, (column, descending) in enumerate(keys):
+        past = column < after[i] if descending else column > after[i]
+        conditions.append(and_(*[columns[j] == after[j] for j in range(i)], past))
+    return ordered.filter(or_(*conditions))
+
+def paginate_keyset(query, scope, keys, default_limit=50, max_limit=200):
+    """
+    Keyset pagination driven by the `limit` and `cursor` query args.
+    - keys: list of (column, descending) pairs; the last one must be unique (usually the id)
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    limit = min(max(request.args.get('limit', default_limit, type=int), 1), max_limit)
+    cursor = request.args.get('cursor')
+    columns = [column for column, _ in keys]
+
+    values = None
+    if cursor:
+        values = decode_cursor(scope, cursor)
+        if values is None or len(values) != len(keys):
+            abort(make_response(jsonify({'error': 'Invalid cursor'}), 400))
+    ordered = keyset_order(query, keys, after=values)
+
+    items = ordered.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(scope, [getattr(items[-1], column.key) for column in columns])
+    return items, next_cursor
+
@@ -0,0 +1,547 @@
+"""
+Performance benchmarks for the matching engine.
+
+Usage:
+    python benchmark.py ann [--jobs 100000] [--dim 300] [--queries 200] [--k 200] [--nprobe 32]
+    python benchmark.py pipe [--sizes 10 100 1000] [--batch-size 64] [--n-process 1]
+    python benchmark.py pipeline [--jobs 300] [--profiles 20]
+    python benchmark.py plans
+    python benchmark.py queries [--scale 10]
+    python benchmark.py routing [--requests 300] [--slow-rate 0.05] [--fail-rate 0.02] [--reset-after 2]
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+
+# Largest allowed difference between batched scores and the per-job formula: one rounding step
+SCORE_TOLERANCE = 0.1
+
+
+def _percentile_ms(samples, q):
+    return round(float(np.percentile(samples, q)) * 1000, 2)
+
+
+def bench_ann(args):
+    """
+    Recall and latency of the IVF index against brute force on clustered unit vectors
+    (job vectors cluster by department/role, so uniform noise would be unrealistic).
+    """
+    from app.services.ann_index import IVFIndex
+
+    rng = np.random.default_rng(args.seed)
+    centers = rng.normal(size=(max(args.jobs // 250, 1), args.dim))
+    vectors = centers[rng.integers(0, len(centers), args.jobs)] + rng.normal(scale=0.8, size=(args.jobs, args.dim))
+    vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+    index = IVFIndex(nprobe=args.nprobe)
+    start = time.perf_counter()
+    index.add_many(list(range(args.jobs)), vectors)
+    print(f"Built index over {args.jobs} vectors in {time.perf_counter() - start:.2f}s "
+          f"({0 if index._centroids is None else len(index._centroids)} lists, nprobe={args.nprobe})")
+
+    queries = vectors[rng.choice(args.jobs, args.queries)] + rng.normal(scale=0.3, size=(args.queries, args.dim)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    recalls, ann_times, exact_times = [], [], []
+    for query in queries:
+        start = time.perf_counter()
+        approx = index.search(query, args.k)
+        ann_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        exact = index.search(query, args.k, exact=True)
+        exact_times.append(time.perf_counter() - start)
+
+        truth = {item_id for item_id, _ in exact}
+        recalls.append(len(truth & {item_id for item_id, _ in approx}) / max(len(truth), 1))
+
+    print(f"recall@{args.k}: {np.mean(recalls):.3f}")
+    print(f"ANN   p50 {_percentile_ms(ann_times, 50)}ms  p95 {_percentile_ms(ann_times, 95)}ms")
+    print(f"Exact p50 {_percentile_ms(exact_times, 50)}ms  p95 {_percentile_ms(exact_times, 95)}ms")
+
+
+def _synthetic_jobs(count, seed):
+    from types import SimpleNamespace
+
+    rng = np.random.default_rng(seed)
+    roles = ['Python Developer', 'Data Analyst', 'DevOps Engineer', 'Product Manager', 'QA Engineer', 'UX Designer']
+    skills = ['python', 'sql', 'docker', 'kubernetes', 'react', 'aws', 'excel', 'figma', 'selenium', 'agile', 'java', 'spark']
+    words = ('we are looking for a motivated engineer to build and maintain services, collaborate with '
+             'cross functional teams, review code, mentor juniors and improve reliability of our platform').split()
+    jobs = []
+    for i in range(count):
+        tags = rng.choice(skills, 4, replace=False)
+        jobs.append(SimpleNamespace(
+            id=None,
+            title=str(rng.choice(roles)),
+            tags=','.join(tags),
+            description=' '.join(rng.choice(words, 120)) + ' ' + ' '.join(tags)
+        ))
+    return jobs
+
+
+def bench_pipe(args):
+    """
+    Job feature extraction: one nlp() call per document vs batched nlp.pipe.
+    """
+    from app.config import Config
+    from app.services.matching_service import matching_service as ms
+
+    Config.NLP_BATCH_SIZE = args.batch_size
+    Config.NLP_N_PROCESS = args.n_process
+
+    for size in args.sizes:
+        jobs = _synthetic_jobs(size, args.seed)
+
+        start = time.perf_counter()
+        for job in jobs:
+            ms._get_lemmas(ms._construct_job_core_text(job))
+            ms._normalized_vector(ms.nlp(ms._construct_job_text_for_vector(job)[:100000]))
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ms.index_jobs(jobs)
+        batched = time.perf_counter() - start
+
+        print(f"{size:>6} docs: nlp() {single * 1000:8.1f}ms  nlp.pipe {batched * 1000:8.1f}ms  "
+              f"speedup x{single / max(batched, 1e-9):.2f}")
+
+
+def _rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _synthetic_profiles(count, seed):
+    jobs = _synthetic_jobs(count, seed + 1)
+    return [{
+        'skills': job.tags.split(','),
+        'experience': [{'title': job.title, 'company': 'Acme', 'description': job.description[:400]}],
+        'education': [{'degree': 'B.Tech', 'institution': 'IIT Madras'}],
+        'summary': f"{job.title} with hands-on {job.tags.replace(',', ', ')} experience"
+    } for job in jobs]
+
+
+def _per_job_score(ms, profile, job):
+    # The original per-job calculate_score (two nlp() calls and Doc.similarity per pair),
+    # kept here as the reference the batched scoring must reproduce
+    if not ms.nlp.has_pipe("tok2vec"):
+        return 0.0
+    job_core_lemmas = ms._get_lemmas(ms._construct_job_core_text(job))
+    profile_text = ms._construct_profile_text(profile)
+    profile_lemmas = ms._get_lemmas(profile_text)
+    if not job_core_lemmas:
+        keyword_score = 0.0
+    else:
+        keyword_score = min(len(job_core_lemmas & profile_lemmas) / len(job_core_lemmas) * 1.5, 1.0)
+
+    raw_semantic = ms.nlp(profile_text[:100000]).similarity(ms.nlp(ms._construct_job_text_for_vector(job)[:100000]))
+    semantic_score = min(max(0, (raw_semantic - 0.6) * 2.5), 1.0)
+
+    final_score = (keyword_score * 0.65) + (semantic_score * 0.35)
+    if keyword_score < 0.2:
+        final_score *= 0.4
+    if keyword_score > 0.8:
+        final_score = max(final_score, 0.85)
+    return float(min(round(final_score * 100, 1), 98.0))
+
+
+def _pipeline_probe(mode, jobs_count, profiles_count, seed):
+    # Runs in a fresh process so memory and the loaded components belong to one mode only
+    os.environ['SPACY_PIPELINE'] = mode
+    import spacy # noqa: F401 (library code is not part of the model's footprint)
+    before = _rss_mb()
+    from app.services.matching_service import matching_service as ms
+    ms.warm_up()
+    loaded = _rss_mb()
+
+    jobs = _synthetic_jobs(jobs_count, seed)
+    latencies = []
+    for job in jobs:
+        start = time.perf_counter()
+        ms.nlp(ms._construct_job_text_for_vector(job)[:100000])
+        latencies.append(time.perf_counter() - start)
+
+    profiles = _synthetic_profiles(profiles_count, seed)
+    scores = [ms.score_many(profile, jobs) for profile in profiles]
+    reference = None
+    if mode == 'full':
+        reference = [[_per_job_score(ms, profile, job) for job in jobs] for profile in profiles]
+    return {
+        'pipes': ms.nlp.pipe_names,
+        'rss_model': loaded - before,
+        'rss_total': _rss_mb(),
+        'p50': _percentile_ms(latencies, 50),
+        'p95': _percentile_ms(latencies, 95),
+        'scores': scores,
+        'reference': reference,
+    }
+
+
+def bench_pipeline(args):
+    """
+    Full vs scoring-only spaCy pipeline: score parity, per-document latency and resident memory.
+    Also checks the batched scores against the original per-job formula (Doc.similarity per pair).
+    Both compute cosine similarity in float32, but the summation order of the dot product differs,
+    so a score may move by one rounding step (0.1) when it sits on a rounding boundary; that is the tolerance.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    results = {}
+    for mode in ('full', 'scoring'):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            results[mode] = pool.submit(_pipeline_probe, mode, args.jobs, args.profiles, args.seed).result()
+        r = results[mode]
+        print(f"{mode:>8}: pipes={','.join(r['pipes']) or '-'}")
+        print(f"{'':>8}  per-doc p50 {r['p50']}ms  p95 {r['p95']}ms  "
+              f"model RSS {r['rss_model']:.0f}MB  process RSS {r['rss_total']:.0f}MB")
+
+    full = np.array(results['full']['scores'])
+    lean = np.array(results['scoring']['scores'])
+    mismatches = int(np.count_nonzero(full != lean))
+    print(f"score parity: {mismatches} mismatches over {full.size} profile x job pairs")
+
+    reference = np.array(results['full']['reference'])
+    drift = np.abs(full - reference)
+    print(f"per-job formula parity: {int(np.count_nonzero(drift))} mismatches over {full.size} pairs, "
+          f"max drift {drift.max():.1f} (tolerance {SCORE_TOLERANCE})")
+    if drift.max() > SCORE_TOLERANCE + 1e-9:
+        sys.exit(1)
+
+
+def _plan_queries():
+    """
+    The hot route queries, built by the same helpers the routes use, as
+    (label, tables that must be searched by index, statement). Keyset pages are
+    planned as a follow-up page (with a cursor), the way the routes run them.
+    Needs an app context.
+    """
+    from datetime import datetime
+    from app.models import Application, ChatMessage, Interview
+    from app.routes.application_routes import MY_APPLICATIONS_ORDER, hr_board_order, hr_board_query, my_applications_query
+    from app.routes.employee_routes import ROSTER_ORDER, roster_query
+    from app.routes.genai_routes import CHAT_HISTORY_ORDER
+    from app.routes.job_routes import jobs_listing_query
+    from app.utils import keyset_order, legacy_profile_query
+
+    def page(query, keys, after):
+        return keyset_order(query, keys, after=after).limit(51).statement
+
+    when = datetime(2025, 1, 1)
+    return [
+        ("my applications", ('applications',),
+         page(my_applications_query(1), MY_APPLICATIONS_ORDER, [when, 10])),
+        ("duplicate application check", ('applications',),
+         Application.query.filter_by(user_id=1, job_id=2).statement),
+        ("HR board, all jobs", ('applications', 'interviews'),
+         page(hr_board_query(1), hr_board_order('applied_at', True), [when, 10])),
+        ("HR board, one job by score", ('applications', 'interviews', 'jobs'),
+         page(hr_board_query(1, job_id=2, include_analysis=True), hr_board_order('match_score', True), [50.0, 10])),
+        ("employee roster", ('employees', 'performances'),
+         page(roster_query(1), ROSTER_ORDER, [10])),
+        ("job listing", ('applications',),
+         jobs_listing_query().limit(20).statement),
+        ("job listing by stored match score", ('applications', 'match_scores'),
+         jobs_listing_query(1).limit(20).statement),
+        ("chat history", ('chat_messages',),
+         page(ChatMessage.query.filter_by(user_id=1), CHAT_HISTORY_ORDER, [when, 10])),
+        ("upcoming interviews", ('interviews',),
+         Interview.query.filter(Interview.application_id == 1, Interview.scheduled_at >= when)
+         .order_by(Interview.scheduled_at).statement),
+        ("legacy user lookup", ('profiles',),
+         legacy_profile_query('Alice123').limit(1).statement),
+    ]
+
+
+def bench_plans(args):
+    """
+    EXPLAIN QUERY PLAN (SQLite) for the hot route queries against a fresh schema.
+    Exits non-zero if any of them scans a table it should search by index.
+    """
+    import tempfile
+
+    workdir = tempfile.mkdtemp(prefix='bench-plans-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.setdefault('SECRET_KEY', 'bench-secret')
+    os.environ['MODEL_WARMUP'] = 'false'
+    from app import create_app
+    from app.config import Config
+    from app.database import db
+
+    Config.SQLALCHEMY_DATABASE_URI = os.environ['DATABASE_URL']
+    app = create_app()
+
+    failures = 0
+    with app.app_context():
+        queries = _plan_queries()
+        with db.engine.connect() as conn:
+            for label, tables, statement in queries:
+                sql = str(statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+                details = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+                scanned = [table for table in tables
+                           if any(detail.startswith(f"SCAN {table}") for detail in details)]
+                failures += bool(scanned)
+                status = f"FULL SCAN of {', '.join(scanned)}" if scanned else 'ok'
+                print(f"{status:>9}  {label}: {' | '.join(details)}")
+
+    print(f"{failures} of {len(queries)} queries scan a table they should search")
+    if failures:
+        sys.exit(1)
+
+
+# (label, who asks, URL, most statements allowed); a count must also not grow with the data
+QUERY_BUDGETS = [
+    ("HR board", 'hr', '/api/hr/applications', 1),
+    ("HR board, one job by score", 'hr', '/api/hr/applications?job_id=1&sort=match_score', 1),
+    ("HR board with analysis", 'hr', '/api/hr/applications?include=analysis', 1),
+    ("employee roster", 'hr', '/api/hr/employees', 1),
+    ("employee roster with reviews", 'hr', '/api/hr/employees?include=performances', 2),
+    ("jobs, anonymous", None, '/api/jobs', 2),
+    ("jobs, candidate with stored scores", 'candidate', '/api/jobs', 5),
+]
+
+
+def _seed_query_data(scale):
+    """
+    An HR user with `scale` jobs, candidates and employees (plus applications, interviews,
+    reviews and stored match scores). Returns the (hr, candidate) user ids.
+    """
+    from datetime import datetime, timedelta
+    from app.database import db
+    from app.models import Application, Employee, Interview, Job, MatchScore, Performance, Profile, User
+    from app.services.matching_service import matching_service
+
+    def add_user(first_name, email, role):
+        user = User(first_name=first_name, last_name='Bench', email=email, role=role)
+        user.set_password('bench')
+        db.session.add(user)
+        db.session.flush()
+        return user
+
+    hr = add_user('Hr', 'hr@bench.local', 'hr')
+    jobs = [Job(title=f"Engineer {i}", tags='python,sql', description="Builds services.", company='Bench',
+                location='Pune', posted_by=hr.id) for i in range(scale)]
+    db.session.add_all(jobs)
+    db.session.flush()
+
+    candidates = []
+    for i in range(scale):
+        user = add_user('Cand', f"cand{i}@bench.local", 'candidate')
+        db.session.add(Profile(user_id=user.id, phone=f"98765{i:05d}", summary="Python developer."))
+        candidates.append(user)
+        for j, job in enumerate(jobs[i % scale:i % scale + 3]):
+            application = Application(user_id=user.id, job_id=job.id, match_score=50.0 + j,
+                                      applied_at=datetime(2025, 1, 1) + timedelta(hours=i * 3 + j))
+            db.session.add(application)
+            db.session.flush()
+            for k in range(j):
+                db.session.add(Interview(application_id=application.id, stage='screening',
+                                         scheduled_at=datetime(2025, 2, 1) + timedelta(days=k)))
+
+        employee = Employee(user_id=user.id, hired_by=hr.id, job_title='Engineer', department='Eng')
+        db.session.add(employee)
+        db.session.flush()
+        for k in range(3):
+            db.session.add(Performance(employee_id=employee.id, date=datetime(2025, 1, 1 + k).date(),
+                                       rating=3.0 + k / 2, comments='ok'))
+
+    # Stored scores for every job, so the candidate's job list needs no spaCy scoring
+    db.session.add_all([MatchScore(user_id=candidates[0].id, job_id=job.id, score=float(job.id % 100),
+                                   algorithm_version=matching_service.algorithm_version) for job in jobs])
+    db.session.commit()
+    return hr.id, candidates[0].id
+
+
+def _count_route_queries(scale):
+    """
+    Statements run by each QUERY_BUDGETS request against a fresh database of the given scale.
+    """
+    import tempfile
+    import jwt
+    from datetime import datetime, timedelta
+    from sqlalchemy import event
+
+    workdir = tempfile.mkdtemp(prefix='bench-queries-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.setdefault('SECRET_KEY', 'bench-secret')
+    os.environ['MODEL_WARMUP'] = 'false'
+    from app import create_app
+    from app.config import Config
+    from app.database import db
+
+    Config.SQLALCHEMY_DATABASE_URI = os.environ['DATABASE_URL']
+    app = create_app()
+    with app.app_context():
+        user_ids = dict(zip(('hr', 'candidate'), _seed_query_data(scale)))
+        engine = db.engine
+
+    def headers(role):
+        if role is None:
+            return {}
+        token = jwt.encode({'user_id': user_ids[role], 'role': role, 'exp': datetime.utcnow() + timedelta(hours=1)},
+                           app.config['SECRET_KEY'], algorithm='HS256')
+        return {'Authorization': f"Bearer {token}"}
+
+    statements = []
+    listener = lambda conn, cursor, statement, *rest: statements.append(statement)
+    event.listen(engine, 'before_cursor_execute', listener)
+    client = app.test_client()
+    counts = {}
+    try:
+        for label, role, url, _ in QUERY_BUDGETS:
+            client.get(url, headers=headers(role)) # warm the identity/token caches
+            del statements[:]
+            response = client.get(url, headers=headers(role))
+            if response.status_code != 200:
+                raise SystemExit(f"{label}: {url} returned {response.status_code}")
+            counts[label] = len(statements)
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+    return counts
+
+
+def bench_queries(args):
+    """
+    Counts the SQL statements (before_cursor_execute) behind the board, roster and jobs
+    endpoints at two data sizes. Exits non-zero if a count grows with the data (an N+1)
+    or goes over its budget.
+    """
+    import subprocess
+
+    # Each size runs in its own process: the app config and model caches are per process
+    sizes = [args.scale, args.scale * 4]
+    results = []
+    for scale in sizes:
+        output = subprocess.run([sys.executable, __file__, 'queries', '--scale', str(scale), '--measure'],
+                                check=True, capture_output=True, text=True).stdout
+        results.append(dict(line.rsplit('\t', 1) for line in output.splitlines() if '\t' in line))
+
+    failures = 0
+    for label, _, url, budget in QUERY_BUDGETS:
+        small, large = int(results[0][label]), int(results[1][label])
+        ok = small == large and large <= budget
+        failures += not ok
+        print(f"{'ok' if ok else 'FAIL':>4}  {label} ({url}): {small} -> {large} statements "
+              f"at {sizes[0]} -> {sizes[1]} rows, budget {budget}")
+
+    print(f"{failures} of {len(QUERY_BUDGETS)} endpoints over budget or growing with the data")
+    if failures:
+        sys.exit(1)
+
+
+def _measure_queries(args):
+    for label, count in _count_route_queries(args.scale).items():
+        print(f"{label}\t{count}")
+
+
+def bench_routing(args):
+    """
+    LLM provider routing against local stub providers (no network): end-to-end latency with
+    sequential fallback vs hedging. The primary is usually fast but sometimes hangs or fails;
+    the fallback is steady. Times are scaled down (ms instead of seconds) to keep runs short.
+    """
+    import threading
+    from app.services.llm_routing import LLMRouter, LatencyTracker, Provider
+
+    rng = np.random.default_rng(args.seed)
+    rng_lock = threading.Lock()
+
+    def stub(median, slow_rate, fail_rate, hang):
+        def call(system_prompt, user_prompt, timeout):
+            with rng_lock:
+                latency = median * float(rng.lognormal(0, 0.3))
+                roll = rng.random()
+            if roll < fail_rate:
+                time.sleep(latency / 4)
+                raise RuntimeError("stub provider error")
+            if roll < fail_rate + slow_rate:
+                latency = hang
+            time.sleep(min(latency, timeout))
+            if latency > timeout:
+                raise TimeoutError("stub provider timed out")
+            return "ok"
+        return call
+
+    def providers():
+        return [
+            Provider('primary', 'stub', stub(0.040, args.slow_rate, args.fail_rate, hang=1.0), 0.5),
+            Provider('fallback', 'stub', stub(0.070, 0.0, 0.0, hang=0.0), 0.5),
+        ]
+
+    configs = [
+        ('sequential', dict(hedging=False)),
+        ('hedge@p95', dict(hedging=True)),
+        ('hedge@60ms', dict(hedging=True, hedge_after=0.060)),
+    ]
+    for label, options in configs:
+        router = LLMRouter(tracker=LatencyTracker(alpha=0.2, reset_after=args.reset_after), **options)
+        router.DEFAULT_HEDGE_AFTER = 0.2
+        latencies, errors = [], 0
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            try:
+                router.generate(providers(), "system", "user")
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+        stats = router.stats()
+        print(f"{label:>11}: p50 {_percentile_ms(latencies, 50)}ms  p95 {_percentile_ms(latencies, 95)}ms  "
+              f"p99 {_percentile_ms(latencies, 99)}ms  errors {errors}  hedges {stats['hedges']} "
+              f"(won {stats['hedge_wins']})  fallbacks {stats['fallbacks']}  timeouts {stats['timeouts']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Matching engine benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ann = commands.add_parser('ann', help="IVF recall/latency vs brute force")
+    ann.add_argument('--jobs', type=int, default=100000)
+    ann.add_argument('--dim', type=int, default=300)
+    ann.add_argument('--queries', type=int, default=200)
+    ann.add_argument('--k', type=int, default=200)
+    ann.add_argument('--nprobe', type=int, default=32)
+    ann.add_argument('--seed', type=int, default=0)
+    ann.set_defaults(func=bench_ann)
+
+    pipe = commands.add_parser('pipe', help="Batched nlp.pipe vs per-document parsing")
+    pipe.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    pipe.add_argument('--batch-size', type=int, default=64)
+    pipe.add_argument('--n-process', type=int, default=1)
+    pipe.add_argument('--seed', type=int, default=0)
+    pipe.set_defaults(func=bench_pipe)
+
+    pipeline = commands.add_parser('pipeline', help="Full vs scoring-only spaCy pipeline (parity, latency, memory)")
+    pipeline.add_argument('--jobs', type=int, default=300)
+    pipeline.add_argument('--profiles', type=int, default=20)
+    pipeline.add_argument('--seed', type=int, default=0)
+    pipeline.set_defaults(func=bench_pipeline)
+
+    plans = commands.add_parser('plans', help="Check the hot route queries use an index (SQLite query plans)")
+    plans.set_defaults(func=bench_plans)
+
+    queries = commands.add_parser('queries', help="Statements per request for the board, roster and jobs endpoints")
+    queries.add_argument('--scale', type=int, default=10, help="jobs, candidates and employees in the smaller dataset")
+    queries.add_argument('--measure', action='store_true', help=argparse.SUPPRESS)
+    queries.set_defaults(func=lambda args: _measure_queries(args) if args.measure else bench_queries(args))
+
+    routing = commands.add_parser('routing', help="LLM routing (deadlines, hedging) against stub providers")
+    routing.add_argument('--requests', type=int, default=300)
+    routing.add_argument('--slow-rate', type=float, default=0.05)
+    routing.add_argument('--fail-rate', type=float, default=0.02)
+    routing.add_argument('--reset-after', type=float, default=2.0, help="seconds before a demoted provider is retried")
+    routing.add_argument('--seed', type=int, default=0)
+    routing.set_defaults(func=bench_routing)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -0,0 +1,95 @@
+"""
+Gunicorn settings for production (pre-fork, model shared copy-on-write):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Environment:
+    GUNICORN_BIND              address to listen on (default 0.0.0.0:5000)
+    WEB_CONCURRENCY            fixed worker count (skips autotuning)
+    GUNICORN_WORKER_MEMORY_MB  private memory one worker adds on top of the shared model
+    GUNICORN_TIMEOUT           worker timeout in seconds
+    GUNICORN_THREADS           request threads per worker
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+# Threaded workers: a streaming chat reply (SSE) holds a thread, not a whole worker
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Load the app (spaCy model + indexes, see wsgi.py) in the master, then fork
+preload_app = True
+
+
+def _meminfo_mb(field):
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _autotune_workers():
+    """
+    2 x CPUs + 1, capped by how many workers fit in available memory.
+    The model is shared, so each worker only costs its private pages (GUNICORN_WORKER_MEMORY_MB,
+    measure it from the 'private' figure logged at worker start once it has served traffic).
+    """
+    if os.getenv('WEB_CONCURRENCY'):
+        return int(os.getenv('WEB_CONCURRENCY'))
+
+    by_cpu = multiprocessing.cpu_count() * 2 + 1
+    available = _meminfo_mb('MemAvailable')
+    if available is None:
+        return by_cpu
+    per_worker = int(os.getenv('GUNICORN_WORKER_MEMORY_MB', 120))
+    by_memory = int(available * 0.8 // per_worker)
+    return max(1, min(by_cpu, by_memory))
+
+
+workers = _autotune_workers()
+
+
+def _process_memory_mb(pid='self'):
+    """
+    Returns (rss, pss, private) in MB. PSS splits shared pages between the processes
+    sharing them, so summing PSS over master + workers gives the real footprint.
+    """
+    values = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    values[parts[0][:-1]] = int(parts[1]) / 1024
+    except OSError:
+        return None
+    private = values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    return values.get('Rss', 0), values.get('Pss', 0), private
+
+
+def _log_memory(log, label, pid='self'):
+    memory = _process_memory_mb(pid)
+    if memory:
+        log.info("%s memory: rss %.0fMB, pss %.0fMB, private %.0fMB", label, *memory)
+
+
+def when_ready(server):
+    server.log.info("Starting %d workers (preloaded app)", workers)
+    _log_memory(server.log, "Master")
+
+
+def post_fork(server, worker):
+    # Connections opened by the master (create_all, index warm-up) must not be shared
+    from app.database import db
+    from wsgi import app
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    _log_memory(worker.log, f"Worker {worker.pid}")
@@ -0,0 +1,30 @@
+"""
+Bulk rescoring on a process pool.
+
+Usage:
+    python rescore.py applications   # recompute Application.match_score for every application
+    python rescore.py match-scores   # store missing match scores (new catalogue / algorithm version)
+
+Interrupted runs resume from the last finished chunk; pass --restart to start over.
+"""
+import argparse
+import os
+
+# The worker pool forks this process: a background warm-up thread still loading the
+# model (and holding its locks) at fork time would deadlock the workers
+os.environ.setdefault('MODEL_WARMUP', 'false')
+
+from app.main import app
+from app.services.bulk_scoring import BulkScorer
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Rescore stored match scores in bulk")
+    parser.add_argument('target', choices=BulkScorer.TARGETS)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count, 1 = no pool)")
+    parser.add_argument('--chunk-size', type=int, default=2000, help="Pairs read and written per batch")
+    parser.add_argument('--checkpoint', default='.rescore_checkpoint.json', help="Progress file used to resume")
+    parser.add_argument('--restart', action='store_true', help="Ignore the checkpoint and start from the beginning")
+    args = parser.parse_args()
+
+    scorer = BulkScorer(app, workers=args.workers, chunk_size=args.chunk_size, checkpoint_path=args.checkpoint)
+    scorer.run(args.target, resume=not args.restart)
@@ -0,0 +1,33 @@
+"""
+Production WSGI entry point, served by gunicorn (see gunicorn.conf.py):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app the master imports this module once before forking, so the spaCy
+model and the matching indexes are built a single time and every worker shares
+those pages copy-on-write instead of loading its own copy.
+"""
+import gc
+import os
+
+# Load synchronously below; a background warm-up thread would not survive the fork
+os.environ.setdefault('MODEL_WARMUP', 'false')
+
+from app.main import app
+from app.services.llm_service import llm_service
+from app.services.matching_service import matching_service
+from app.services.match_store import match_store
+
+
+def preload():
+    print("Preloading matching model and indexes...")
+    matching_service.warm_up()
+    llm_service.warm_up()
+    with app.app_context():
+        match_store.warm_indexes()
+    # Move everything loaded so far out of the collector's reach: a GC pass in a
+    # worker would otherwise write to these objects and un-share their pages
+    gc.freeze()
+
+
+preload()
@@ -1,7 +1,7 @@
 import React, { useState, useEffect, useRef } from "react";
 import ReactMarkdown from 'react-markdown';
 import { 
-  askChatbot, 
+  streamChatbot, 
   getChatHistory, 
   clearChatHistory, 
   getApplications, 
@@ -140,10 +140,21 @@ const ChatbotTool = () => {
     setInput("");
     setLoading(true);
 
+    // Append the reply to the last (bot) message as it streams in
+    const setBotText = (update) => setMessages(prev => [...prev.slice(0, -1), { sender: "bot", text: update(prev[prev.length - 1].text) }]);
+    let started = false;
     try {
-      const res = await askChatbot(text);
+      const res = await streamChatbot(text, (chunk) => {
+        if (!started) {
+          started = true;
+          setLoading(false);
+          setMessages(prev => [...prev, { sender: "bot", text: "" }]);
+        }
+        setBotText(current => current + chunk);
+      });
       const botReply = res.reply || "Sorry, I couldn't understand that.";
-      setMessages(prev => [...prev, { sender: "bot", text: botReply }]);
+      if (started) setBotText(() => botReply);
+      else setMessages(prev => [...prev, { sender: "bot", text: botReply }]);
     } catch (err) {
       setMessages(prev => [...prev, { sender: "bot", text: "Error connecting to chatbot." }]);
     } finally {
@@ -29,7 +29,7 @@ const Performance = () => {
   useEffect(() => {
     async function loadData() {
         try {
-            const employees = await getEmployees();
+            const employees = await getEmployees({ includePerformances: true });
             
             // --- Metrics Calculation ---
             const total = employees.length;
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
-import { getMyJobs, getEmployees, getCandidates, axiosAuth, getCompanyApplications, updateApplicationStatus,
+import { getMyJobs, getEmployees, getCandidates, axiosAuth, getCompanyApplications, getJobApplicantsPage, updateApplicationStatus,
   scheduleInterview, getApplicationExplanation } from "../services/api";
 import {
   Users,
@@ -44,6 +44,8 @@ const RecruitmentTab = () => {
   const [showApplicantsModal, setShowApplicantsModal] = useState(false);
   const [currentJobApplicants, setCurrentJobApplicants] = useState([]);
   const [loadingApplicants, setLoadingApplicants] = useState(false);
+  const [applicantsCursor, setApplicantsCursor] = useState(null);
+  const [loadingMoreApplicants, setLoadingMoreApplicants] = useState(false);
   const [explanationModal, setExplanationModal] = useState({ 
         show: false, 
         data: null, 
@@ -166,20 +168,31 @@ const RecruitmentTab = () => {
     setShowApplicantsModal(true);
     setLoadingApplicants(true);
     try {
-      const apps = await getCompanyApplications(job.id);
-      const sortedApps = apps.sort((a, b) => {
-        const scoreA = a.match_score || 0;
-        const scoreB = b.match_score || 0;
-        return scoreB - scoreA; 
-      });
-      setCurrentJobApplicants(sortedApps);
+      // Sorted by match score on the server, one page at a time
+      const { applications, nextCursor } = await getJobApplicantsPage(job.id);
+      setCurrentJobApplicants(applications);
+      setApplicantsCursor(nextCursor);
     } catch (err) {
       console.error("Failed to load applicants", err);
       setCurrentJobApplicants([]);
+      setApplicantsCursor(null);
     }
     setLoadingApplicants(false);
   };
 
+  const handleLoadMoreApplicants = async () => {
+    if (!viewingJob || !applicantsCursor) return;
+    setLoadingMoreApplicants(true);
+    try {
+      const { applications, nextCursor } = await getJobApplicantsPage(viewingJob.id, applicantsCursor);
+      setCurrentJobApplicants(prev => [...prev, ...applications]);
+      setApplicantsCursor(nextCursor);
+    } catch (err) {
+      console.error("Failed to load more applicants", err);
+    }
+    setLoadingMoreApplicants(false);
+  };
+
   const handleApplicationAction = async (appId, newStatus) => {
     try {
       await updateApplicationStatus(appId, newStatus);
@@ -875,6 +888,15 @@ const RecruitmentTab = () => {
                               </div>
                             </div>
                           ))}
+                          {applicantsCursor && (
+                            <button
+                              onClick={handleLoadMoreApplicants}
+                              disabled={loadingMoreApplicants}
+                              className="w-full py-2 text-sm font-semibold text-[#005193] bg-white border border-gray-200 rounded-lg hover:bg-gray-50 transition disabled:opacity-50"
+                            >
+                              {loadingMoreApplicants ? "Loading..." : "Load more applicants"}
+                            </button>
+                          )}
                         </div>
                       )}
                     </div>
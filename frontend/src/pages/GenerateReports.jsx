@@ -248,7 +248,7 @@ const GenerateReports = () => {
                     Name: emp.name,
                     Department: emp.department,
                     AvgRating: emp.performance_avg || "N/A",
-                    Reviews: emp.performances ? emp.performances.length : 0
+                    Reviews: emp.review_count || 0
                 }));
                 columns = [
                     { header: 'Employee', dataKey: 'Name' },
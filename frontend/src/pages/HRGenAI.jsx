@@ -1,7 +1,7 @@
 import React, { useState, useEffect, useRef } from "react";
 import ReactMarkdown from 'react-markdown';
 import { useNavigate } from "react-router-dom";
-import { askChatbot, getChatHistory, clearChatHistory, getCurrentUser, getDepartments, getMyJobs, getCompanyApplications, axiosAuth } from "../services/api";
+import { streamChatbot, getChatHistory, clearChatHistory, getCurrentUser, getDepartments, getMyJobs, getCompanyApplications, axiosAuth } from "../services/api";
 import { Send, Plus, Bot, BarChart2, FileText, Sparkles, MessageSquare, ClipboardList, PenTool, AlertCircle, CheckCircle, Users, Briefcase, Trash2 } from "lucide-react";
 import SidebarHR from "../components/SidebarHR";
 import TopNavbarHR from "../components/TopNavbarHR";
@@ -111,11 +111,22 @@ const ChatbotTool = ({ onNewChat }) => {
         setMessages((prev) => [...prev, userMessage]);
         setInput("");
         setBotThinking(true);
+        // Append the reply to the last (bot) message as it streams in
+        const setBotText = (update) => setMessages((prev) => [...prev.slice(0, -1), { sender: "bot", text: update(prev[prev.length - 1].text) }]);
+        let started = false;
         try {
-            const data = await askChatbot(input);
+            const data = await streamChatbot(input, (chunk) => {
+                if (!started) {
+                    started = true;
+                    setBotThinking(false);
+                    setMessages((prev) => [...prev, { sender: "bot", text: "" }]);
+                }
+                setBotText((current) => current + chunk);
+            });
             setBotThinking(false);
-            const aiResponse = { sender: "bot", text: data.reply || "No response." };
-            setMessages((prev) => [...prev, aiResponse]);
+            const reply = data.reply || "No response.";
+            if (started) setBotText(() => reply);
+            else setMessages((prev) => [...prev, { sender: "bot", text: reply }]);
         } catch (err) {
             setBotThinking(false);
             setMessages((prev) => [
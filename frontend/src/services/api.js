@@ -94,23 +94,38 @@ export const withdrawApplication = async (appId) => {
     return res.data;
 };
 
+// List endpoints return one page at a time; the next cursor comes back in the
+// X-Next-Cursor header or in the body's pagination.next_cursor
+const nextCursorOf = (res) =>
+    res.headers["x-next-cursor"] || res.data?.pagination?.next_cursor || null;
+
+// Follows the cursors for views that need every row (counts, analytics, reports)
+const getAllPages = async (url, params, pickItems) => {
+    const items = [];
+    let cursor = null;
+    do {
+        const res = await axiosAuth.get(url, {
+            params: { ...params, limit: 200, ...(cursor ? { cursor } : {}) },
+        });
+        items.push(...pickItems(res.data));
+        cursor = nextCursorOf(res);
+    } while (cursor);
+    return items;
+};
+
 export const getApplications = async () => {
-    const res = await axiosAuth.get("/applications/my");
-
-    if (Array.isArray(res.data)) {
-        return res.data.map((item) => ({
-            id: item.application_details.id,
-            job_id: item.application_details.job_id,
-            status: item.application_details.status,
-            applied_at: item.application_details.applied_at,
-            title: item.job_details.title,
-            company: item.job_details.company,
-            tags: item.job_details.tags || [],
-            description: item.job_details.description,
-            salary: item.job_details.salary || "Not disclosed",
-        }));
-    }
-    return [];
+    const items = await getAllPages("/applications/my", {}, (data) => (Array.isArray(data) ? data : []));
+    return items.map((item) => ({
+        id: item.application_details.id,
+        job_id: item.application_details.job_id,
+        status: item.application_details.status,
+        applied_at: item.application_details.applied_at,
+        title: item.job_details.title,
+        company: item.job_details.company,
+        tags: item.job_details.tags || [],
+        description: item.job_details.description,
+        salary: item.job_details.salary || "Not disclosed",
+    }));
 };
 
 export const getProfileMe = async (userId) => {
@@ -193,22 +208,26 @@ export const scheduleInterview = async (interviewData) => {
 
 // --- HR API ---
 
-export const getEmployees = async () => {
-    const res = await axiosAuth.get("/hr/employees");
-    if (res.data.employees) return res.data.employees;
-    return res.data;
+export const getEmployees = async ({ includePerformances = false } = {}) => {
+    const params = includePerformances ? { include: "performances" } : {};
+    return getAllPages("/hr/employees", params, (data) => data.employees || []);
 };
 
 export const getCandidates = async () => {
-    const res = await axiosAuth.get("/auth/users/basic");
-    return res.data;
+    return getAllPages("/auth/users/basic", {}, (data) => (Array.isArray(data) ? data : []));
 };
 
 export const getCompanyApplications = async (jobId = null) => {
-    const url = jobId ? `/hr/applications?job_id=${jobId}` : "/hr/applications";
-    const res = await axiosAuth.get(url);
-    if (res.data.applications) return res.data.applications;
-    return [];
+    const params = jobId ? { job_id: jobId } : {};
+    return getAllPages("/hr/applications", params, (data) => data.applications || []);
+};
+
+// One page of a job's applicants, best match first; pass the returned nextCursor to load more
+export const getJobApplicantsPage = async (jobId, cursor = null) => {
+    const res = await axiosAuth.get("/hr/applications", {
+        params: { job_id: jobId, sort: "match_score", limit: 50, ...(cursor ? { cursor } : {}) },
+    });
+    return { applications: res.data.applications || [], nextCursor: nextCursorOf(res) };
 };
 
 export const updateApplicationStatus = async (appId, status) => {
@@ -289,9 +308,55 @@ export const askChatbot = async (prompt) => {
     return res.data;
 };
 
+// Streams the reply as Server-Sent Events: onToken(text) per chunk, resolves with { reply }.
+// Uses fetch because axios can't read a response body incrementally in the browser.
+export const streamChatbot = async (prompt, onToken) => {
+    const token = getToken();
+    const res = await fetch(`${API_BASE}/gen-ai/chat/stream`, {
+        method: "POST",
+        headers: {
+            "Content-Type": "application/json",
+            ...(token ? { Authorization: `Bearer ${token}` } : {}),
+        },
+        body: JSON.stringify({ prompt }),
+    });
+    if (!res.ok || !res.body) throw new Error(`Chat stream failed (${res.status})`);
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line: "event: <name>\ndata: <json>"
+        let boundary;
+        while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+            const raw = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            const event = (raw.match(/^event: (.*)$/m) || [])[1];
+            const data = JSON.parse((raw.match(/^data: (.*)$/m) || [])[1] || "{}");
+            if (event === "token") onToken(data.text);
+            else if (event === "done") return data;
+            else if (event === "error") throw new Error(data.error);
+        }
+    }
+    throw new Error("Chat stream ended unexpectedly");
+};
+
+// Pages come newest first (each page oldest-to-newest); older pages are prepended
 export const getChatHistory = async () => {
-    const res = await axiosAuth.get("/gen-ai/history");
-    return res.data;
+    let messages = [];
+    let cursor = null;
+    do {
+        const res = await axiosAuth.get("/gen-ai/history", {
+            params: { limit: 200, ...(cursor ? { cursor } : {}) },
+        });
+        messages = [...(Array.isArray(res.data) ? res.data : []), ...messages];
+        cursor = nextCursorOf(res);
+    } while (cursor);
+    return messages;
 };
 
 export const clearChatHistory = async () => {